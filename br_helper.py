@@ -1,5 +1,6 @@
 
 import csv
+import itertools
 import json
 import os
 import time
@@ -19,6 +20,593 @@ from selenium.webdriver.common.desired_capabilities import DesiredCapabilities
 DRIVER_PATH = ""
 
 
+# file extensions of each resource type for block_resources option
+_BLOCKED_EXTENSIONS = {
+    "images": ["png", "jpg", "jpeg", "gif", "webp", "svg",
+               "ico", "bmp", "avif"],
+    "media": ["mp4", "webm", "mp3", "ogg", "wav", "m4a",
+              "m3u8", "flac", "avi", "mov"],
+    "fonts": ["woff", "woff2", "ttf", "otf", "eot"],
+    "stylesheets": ["css"],
+}
+
+# url patterns that block_resources option uses for each resource type
+# on chrome(firefox uses preferences, see _add_necessary_options),
+# extensions are matched with and without query string
+_BLOCKED_URL_PATTERNS = {
+    key: [pattern for extension in value
+          for pattern in (f"*.{extension}", f"*.{extension}?*")]
+    for key, value in _BLOCKED_EXTENSIONS.items()}
+
+_BLOCKED_URL_PATTERNS["ads"] = [
+    "*google-analytics.com*",       "*googletagmanager.com*",
+    "*googlesyndication.com*",      "*googleadservices.com*",
+    "*doubleclick.net*",            "*adservice.google.*",
+    "*connect.facebook.net*",       "*amazon-adsystem.com*",
+    "*scorecardresearch.com*",      "*hotjar.com*",
+    "*adnxs.com*",                  "*criteo.com*",
+    "*taboola.com*",                "*outbrain.com*",
+    "*mc.yandex.ru*",               "*quantserve.com*",
+]
+
+
+#################################################
+########   javascript snippets we reuse   #######
+#################################################
+
+# installs (once per document) observer that counts DOM mutations
+# and returns "document_id:mutations_count" string, so we can
+# cheaply check if page changed since last time we looked at it
+_JS_DOM_VERSION = '''
+    if (!window.__brh_dom) {
+        window.__brh_dom = {
+            id: Math.random().toString(36).slice(2),
+            count: 0};
+
+        new MutationObserver(function (records) {
+            window.__brh_dom.count += records.length;
+        }).observe(document, {childList: true,     subtree: true,
+                              attributes: true,    characterData: true});
+    }
+    return window.__brh_dom.id + ":" + window.__brh_dom.count;
+'''
+
+# function expression that tells if element seems interactable,
+# approximately same logic as selenium's is_displayed & is_enabled
+_JS_IS_INTERACTABLE = '''
+    function (el) {
+        if (el.disabled) { return false; }
+
+        // options are visible if their select tag is visible
+        if (el.tagName === "OPTION" || el.tagName === "OPTGROUP") {
+            el = el.closest("select") || el;
+            if (el.disabled) { return false; }
+        }
+
+        var style = window.getComputedStyle(el);
+        if (style.visibility === "hidden" || style.visibility === "collapse"
+                || style.display === "none" || style.opacity === "0") {
+            return false;
+        }
+
+        // transparent ancestor hides element too
+        if (el.checkVisibility) {
+            if (!el.checkVisibility({opacityProperty: true})) {
+                return false;
+            }
+        } else {
+            for (var node = el.parentElement; node; node = node.parentElement) {
+                if (window.getComputedStyle(node).opacity === "0") {
+                    return false;
+                }
+            }
+        }
+
+        var rect = el.getBoundingClientRect();
+        return el.getClientRects().length > 0
+                    && rect.width > 0 && rect.height > 0;
+    }
+'''
+
+# function expression to get list of nodes matching css or xpath selector
+# inside given context node. xpath selectors start with /, ./ or ../
+# (relative ones are evaluated from context node), everything else is css.
+# empty selector means context node itself.
+_JS_QUERY_ALL = '''
+    function (context, selector) {
+        if (!selector) { return [context]; }
+
+        if (/^(\\/|\\.\\/|\\.\\.\\/)/.test(selector)) {
+            var nodes = [];
+            var results = document.evaluate(
+                    selector, context, null,
+                    XPathResult.ORDERED_NODE_SNAPSHOT_TYPE, null);
+
+            for (var i = 0; i < results.snapshotLength; i++) {
+                nodes.push(results.snapshotItem(i));
+            }
+            return nodes;
+        }
+        return Array.prototype.slice.call(context.querySelectorAll(selector));
+    }
+'''
+
+# walks the DOM and collects records described by compiled schema,
+# see BrowserHelper.extract method for more details
+_JS_EXTRACT = '''
+    var queryAll = %s;
+    var rootSelector = arguments[0];
+    var schema = arguments[1];
+    var normalize = arguments[2];
+
+    var getValue = function (node, attr) {
+        var value;
+
+        if (attr === "text") {
+            value = (node.innerText !== undefined) ? node.innerText
+                                                   : node.textContent;
+        } else if (attr === "html") {
+            value = node.innerHTML;
+        } else {
+            // prefer properties(absolute urls for href/src), like selenium
+            value = node[attr];
+            if (value === undefined || value === null
+                                    || typeof value === "object") {
+                value = node.getAttribute ? node.getAttribute(attr) : null;
+            }
+        }
+
+        if (normalize && typeof value === "string") {
+            value = value.replace(/\\s+/g, " ").trim();
+        }
+        return value;
+    };
+
+    var extractRecord = function (context, fields) {
+        var record = {};
+
+        Object.keys(fields).forEach(function (name) {
+            var field = fields[name];
+            var nodes = queryAll(context, field.selector);
+
+            if (!field.many) { nodes = nodes.slice(0, 1); }
+
+            var values = nodes.map(function (node) {
+                return field.fields ? extractRecord(node, field.fields)
+                                    : getValue(node, field.attr);
+            });
+            record[name] = field.many ? values
+                                      : (values.length ? values[0] : null);
+        });
+        return record;
+    };
+
+    if (rootSelector === null) {
+        return extractRecord(document, schema);
+    }
+    return queryAll(document, rootSelector).map(function (node) {
+        return extractRecord(node, schema);
+    });
+''' % _JS_QUERY_ALL
+
+# installs (once per document) counters of in-flight fetch/XHR requests
+# and times of last network activity and last DOM mutation
+_JS_NETWORK_TRACKER = '''
+    (function () {
+        if (window.__brh_net) { return; }
+
+        var net = window.__brh_net = {
+            inflight: 0,
+            lastNetwork: Date.now(),
+            lastMutation: Date.now()};
+
+        var started = function () {
+            net.inflight += 1;
+            net.lastNetwork = Date.now();
+        };
+        var finished = function () {
+            net.inflight = Math.max(0, net.inflight - 1);
+            net.lastNetwork = Date.now();
+        };
+
+        if (window.fetch) {
+            var originalFetch = window.fetch;
+
+            window.fetch = function () {
+                started();
+                return originalFetch.apply(this, arguments).then(
+                    function (response) { finished(); return response; },
+                    function (error) { finished(); throw error; });
+            };
+        }
+
+        var originalSend = XMLHttpRequest.prototype.send;
+
+        XMLHttpRequest.prototype.send = function () {
+            started();
+            this.addEventListener("loadend", finished);
+            return originalSend.apply(this, arguments);
+        };
+
+        new MutationObserver(function () {
+            net.lastMutation = Date.now();
+        }).observe(document, {childList: true,     subtree: true,
+                              attributes: true,    characterData: true});
+    })();
+'''
+
+# waits(checking inside page) until there were no DOM changes(and also
+# no network requests, if asked) for given time. returns false on timeout
+_JS_WAIT_UNTIL_IDLE = _JS_NETWORK_TRACKER + '''
+    var idleTime = arguments[0] * 1000;
+    var timeout = arguments[1] * 1000;
+    var checkNetwork = arguments[2];
+    var done = arguments[arguments.length - 1];
+    var start = Date.now();
+
+    var check = function () {
+        var now = Date.now();
+        var net = window.__brh_net;
+
+        var idle = document.readyState === "complete"
+                        && now - net.lastMutation >= idleTime;
+
+        if (checkNetwork) {
+            idle = idle && net.inflight === 0
+                        && now - net.lastNetwork >= idleTime;
+        }
+
+        if (idle) { done(true); }
+        else if (now - start >= timeout) { done(false); }
+        else { setTimeout(check, 50); }
+    };
+    check();
+'''
+
+# starts calling user's javascript handler(inserted instead of %s) for
+# nodes matching selector when they appear or change, events that
+# handler emits are kept in page until react_events method takes them
+_JS_REACT = '''
+    var queryAll = %s;
+    var handler = (%%s);
+    var selector = arguments[0];
+
+    var state = window.__brh_react = window.__brh_react || {
+        nextId: 0, events: [], waiting: null, observers: {}};
+    var id = state.nextId++;
+
+    var emit = function (data) {
+        state.events.push({id: id, data: data});
+        if (state.waiting) { state.waiting(); }
+    };
+
+    var run = function (nodes) {
+        nodes.forEach(function (node) {
+            try { handler(node, emit); }
+            catch (error) { emit({error: String(error)}); }
+        });
+    };
+
+    var observer = new MutationObserver(function (records) {
+        // matches that changed themselves or inside, or were added
+        // (not all of them, when something around them changes)
+        run(queryAll(document, selector).filter(function (node) {
+            return records.some(function (record) {
+                if (node.contains(record.target)) { return true; }
+
+                return Array.prototype.some.call(record.addedNodes,
+                    function (added) { return added.contains(node); });
+            });
+        }));
+
+        // changes that handlers made themselves do not trigger them again
+        observer.takeRecords();
+    });
+    observer.observe(document, {childList: true,     subtree: true,
+                                attributes: true,    characterData: true});
+    state.observers[id] = observer;
+
+    // already existing matches
+    run(queryAll(document, selector));
+
+    return id;
+''' % _JS_QUERY_ALL
+
+# waits until page has some events from react handlers(or timeout)
+# and returns them all, null means that page changed and they are lost
+_JS_REACT_EVENTS = '''
+    var timeout = arguments[0] * 1000;
+    var done = arguments[arguments.length - 1];
+    var state = window.__brh_react;
+
+    if (!state) { done(null); return; }
+
+    var flush = function () {
+        var events = state.events;
+        state.events = [];
+        state.waiting = null;
+        done(events);
+    };
+
+    if (state.events.length) { flush(); return; }
+
+    var timer = setTimeout(flush, timeout);
+
+    state.waiting = function () {
+        state.waiting = null;
+        clearTimeout(timer);
+        // let events from same changes arrive too
+        setTimeout(flush, 0);
+    };
+'''
+
+# waits(in page, without polling from python) until one of
+# conditions becomes true and returns its index, or -1 on timeout.
+# see BrowserHelper.wait_for_any method for more details
+_JS_WAIT_FOR = '''
+    var queryAll = %s;
+    var isInteractable = %s;
+    var conditions = arguments[0];
+    var timeout = arguments[1];
+    var done = arguments[arguments.length - 1];
+
+    var getElements = function (selector) {
+        // xpath may select text nodes, use their parents then
+        return queryAll(document, selector).map(function (node) {
+            return node.nodeType === 1 ? node : node.parentElement;
+        }).filter(function (node) { return node; });
+    };
+
+    var check = function () {
+        for (var i = 0; i < conditions.length; i++) {
+            var condition = conditions[i];
+            var elements = getElements(condition.selector);
+            var happened = false;
+
+            if (condition.state === "appear") {
+                happened = elements.some(isInteractable);
+            } else if (condition.state === "disappear") {
+                happened = !elements.some(isInteractable);
+            } else if (condition.state === "text") {
+                happened = elements.some(function (el) {
+                    var text = el.innerText || el.textContent || "";
+                    return text.indexOf(condition.value) !== -1;
+                });
+            } else if (condition.state === "count") {
+                happened = elements.length >= condition.value;
+            }
+
+            if (happened) { return i; }
+        }
+        return -1;
+    };
+
+    var first = check();
+    if (first !== -1) { done(first); return; }
+
+    var finished = false;
+    var observer, timer;
+
+    var finish = function (result) {
+        if (finished) { return; }
+        finished = true;
+        observer.disconnect();
+        clearTimeout(timer);
+        done(result);
+    };
+
+    observer = new MutationObserver(function () {
+        var result = check();
+        if (result !== -1) { finish(result); }
+    });
+    observer.observe(document, {childList: true,     subtree: true,
+                                attributes: true,    characterData: true});
+
+    timer = setTimeout(function () { finish(-1); }, timeout * 1000);
+''' % (_JS_QUERY_ALL, _JS_IS_INTERACTABLE)
+
+# starts loading url in current tab, without waiting until it loads,
+# old document is marked, to not think that it is already loaded one
+_JS_NAVIGATE_LATER = '''
+    var url = arguments[0];
+    document.__brh_old = true;
+    setTimeout(function () { location.href = url; }, 0);
+'''
+
+# state of tab's document, "loading" while old one is still there,
+# "error" for browser's network error pages(they are "complete" too)
+_JS_TAB_STATE = '''
+    if (document.__brh_old) { return "loading"; }
+
+    var uri = document.documentURI || "";
+    if (uri.indexOf("chrome-error://") === 0
+            || uri.indexOf("about:neterror") === 0) { return "error"; }
+
+    return document.readyState;
+'''
+
+
+def _bind_driver_to_window(driver, handle, lock, state):
+    '''
+    returns shallow copy of selenium webdriver, that sends each
+    command to given window(switching to it first, if other window is
+    current one), so few copies can be used from different threads,
+    each in its own window(see BrowserHelper's new_context method).
+
+    lock is held for one command only. As navigation command would
+    hold it until page loads, get only starts loading page and its
+    state is checked by separate commands(see get_in_window function).
+
+    depends on selenium 3(tested with 3.141) internals: every command
+    goes through driver's execute(driver_command, params) method, which
+    is replaced in copy, so elements, switch_to and others made from it
+    use it too. Original driver is not changed.
+
+    arguments:
+        1. driver - webdriver to copy
+        2. handle - window handle to use
+        3. lock - threading.RLock shared by all copies, so only one
+                command is sent at a time
+        4. state - dictionary shared by all copies,
+                "current" key has browser's current window handle,
+                "page_timeout" - maximum seconds to wait until page
+                loads(page_timeout option, or get's default
+                ready_timeout - 30 seconds)
+    '''
+    import copy
+    import functools
+
+    from selenium.webdriver.remote.command import Command
+    from selenium.webdriver.remote.switch_to import SwitchTo
+
+    bound = copy.copy(driver)
+    bound._switch_to = SwitchTo(bound)
+
+    # webdriver class' own method, not one of other copy
+    execute = functools.partial(type(driver).execute, bound)
+    window = {"handle": handle}
+
+    def get_in_window(url):
+        bound.execute_script("document.__brh_old = true;")
+        navigation = bound.execute_cdp_cmd("Page.navigate", {"url": url})
+
+        # 204 responses and downloads do not replace document,
+        # as usual get, we just stay on current page then
+        if navigation.get("errorText") == "net::ERR_ABORTED":
+            bound.execute_script("delete document.__brh_old;")
+            return {"value": None}
+
+        # same errors, as usual get raises
+        if navigation.get("errorText"):
+            raise selenium.common.exceptions.WebDriverException(
+                        f"unknown error: {navigation['errorText']} ({url})")
+
+        # same document navigation(only hash changed), nothing to load
+        if not navigation.get("loaderId"):
+            bound.execute_script("delete document.__brh_old;")
+            return {"value": None}
+
+        timeout = state["page_timeout"]
+        start = time.time()
+
+        while True:
+            tab_state = bound.execute_script(_JS_TAB_STATE)
+
+            if tab_state == "complete":
+                return {"value": None}
+
+            if tab_state == "error":
+                raise selenium.common.exceptions.WebDriverException(
+                            f"unknown error: net::ERR_FAILED ({url})")
+
+            if time.time() - start > timeout:
+                raise selenium.common.exceptions.TimeoutException(
+                            f"timeout: {url} did not load in "
+                            f"{timeout} seconds")
+
+            time.sleep(0.05)
+
+    def execute_in_window(driver_command, params=None):
+        if driver_command == Command.GET:
+            return get_in_window(params["url"])
+
+        if driver_command == Command.SET_TIMEOUTS:
+            if "pageLoad" in params:
+                state["page_timeout"] = params["pageLoad"] / 1000
+            elif params.get("type") == "page load":
+                state["page_timeout"] = params["ms"] / 1000
+
+        with lock:
+            if state["current"] != window["handle"]:
+                execute(Command.SWITCH_TO_WINDOW,
+                        {"handle": window["handle"],
+                         "name": window["handle"]})
+                state["current"] = window["handle"]
+
+            result = execute(driver_command, params)
+
+            # copy may use other tabs of its context too
+            if driver_command == Command.SWITCH_TO_WINDOW:
+                window["handle"] = params.get("handle", params.get("name"))
+                state["current"] = window["handle"]
+
+            elif driver_command == Command.CLOSE:
+                state["current"] = None
+
+            return result
+
+    bound.execute = execute_in_window
+    return bound
+
+
+def _proc_children():
+    '''
+    returns dictionary of parent pid --> list of child pids
+    of all running processes, read from /proc(Linux only).
+    '''
+    children = {}
+
+    for entry in os.listdir("/proc"):
+        if not entry.isdigit():
+            continue
+        try:
+            with open(f"/proc/{entry}/stat") as f: stat = f.read()
+        except OSError:
+            continue  # process already finished
+        # process name may contain spaces, so split after it
+        ppid = int(stat.rsplit(")", 1)[1].split()[1])
+        children.setdefault(ppid, []).append(int(entry))
+
+    return children
+
+
+def _process_tree_memory(pid, children):
+    '''
+    returns memory usage(RSS, in MB) of process with given pid and
+    all its descendants, children is result of _proc_children function.
+    '''
+    page_size = os.sysconf("SC_PAGE_SIZE")
+    total = 0
+    pids = [pid]
+
+    while pids:
+        pid = pids.pop()
+        try:
+            with open(f"/proc/{pid}/statm") as f:
+                total += int(f.read().split()[1]) * page_size
+        except OSError:
+            continue
+        pids.extend(children.get(pid, []))
+
+    return total / 1024 ** 2
+
+
+def _new_http_session(pool_size=10, proxy=None, headers=None):
+    '''
+    returns requests session, that keeps pool_size connections
+    per host open, uses browser like user agent, given proxy(ip:port)
+    and headers dictionary.
+    '''
+    import requests
+    from requests.adapters import HTTPAdapter
+
+    session = requests.Session()
+
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+
+    session.headers["User-Agent"] = (
+                    "Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 "
+                    "(KHTML, like Gecko) Chrome/78.0 Safari/537.36")
+    session.headers.update(headers or {})
+
+    if proxy:
+        session.proxies = {"http": f"http://{proxy}",
+                           "https": f"http://{proxy}"}
+    return session
+
+
 class BrowserHelper:
     '''
     class to help automate browser
@@ -26,13 +614,23 @@ class BrowserHelper:
     def __init__(self,                      browser="chrome",
                  driver_path=None,          options=False,       
                  add_arguments=[],          desired_capabilities={},
-                 experimental_options=[],   log_file="log.txt"):
+                 experimental_options=[],   log_file="log.txt",
+                 in_page_interactables=True):
         '''
         initialize object with given arguments:
             1. browser - browser to work with("chrome" or "firefox").
                         currently development uses chrome,
                         but firefox has support for basic functionality.
 
+                        "static" can also be used for pages that do not
+                        need javascript: pages are downloaded with http
+                        client(requests) and parsed with lxml, without
+                        real browser, which is much faster. get, css,
+                        css1, xpath, xpath1, find, bcss and home methods
+                        work the same way, javascript based ones
+                        (js, extract, wait_for...) do not.
+                        (needs requests and cssselect packages)
+
             2. driver_path - driver file location(appropriate for browser).
                             Takes precedence over global DRIVER_PATH variable.
 
@@ -59,6 +657,7 @@ class BrowserHelper:
                             . proxy                  (string)
                             . user_data_dir          (string)
                             . disable_infobars       (boolean)
+                            . block_resources        (list)
 
                         see _add_necessary_options for more details.
 
@@ -76,8 +675,20 @@ class BrowserHelper:
             
             7. log_file - log file to use in self.log method.
                          default=("log.txt")
+
+            8. in_page_interactables - if set to True(default), elements
+                        are checked for interactability inside the page
+                        with one javascript call for all of them,
+                        otherwise selenium's is_displayed and is_enabled
+                        methods are called for each element(2 requests
+                        per element, but it is the old behaviour, so
+                        useful for comparisons).
         '''
-        if driver_path is None:
+        if browser == "static":
+            # no real browser, so no driver too
+            self.driver_path = None
+
+        elif driver_path is None:
             # maybe variable is defined
             global DRIVER_PATH
 
@@ -95,15 +706,54 @@ class BrowserHelper:
             self.driver_path = driver_path
 
         self.br = False
+        # seconds it took to launch browser and get first answer from it
+        self.startup_time = None
         self.log_file = log_file
         # for later use
         self.keys = ""
 
+        # parsed page source cache for bcss method,
+        # see _get_soup method for more details
+        self._soup = None
+        self._soup_dom_version = None
+
+        # body element and key names cache for press methods
+        self._body = None
+        self._key_cache = {}
+
+        # see _install_network_tracker method
+        self._network_tracker_installed = False
+
+        # drivers used in hybrid mode of get method, and number
+        # of pages that were loaded without/with real browser
+        self._static_br = None
+        self._real_br = False
+        self.fetch_stats = {"static": 0, "browser": 0}
+        # real browser loaded page after its cookies were copied
+        # to static driver, so they may be different now
+        self._static_cookies_stale = True
+
+        # semaphore to launch real browser with(BrowserPool sets it),
+        # so not too many browsers are launching at the same time
+        self._launch_semaphore = None
+
+        # (owner's driver, browserContextId), if this object is isolated
+        # context of other one's browser(see new_context method), and
+        # lock with current window state, shared by browser's contexts
+        self._context = None
+        self._window_lock = None
+        self._window_state = None
+
+        # url patterns to block after launch(chrome only), set
+        # from block_resources option when browser options are made
+        self._blocked_url_patterns = []
+
         self.options = options  # supply dictionary
         self.add_arguments = add_arguments
         self.experimental_options = experimental_options
         self.desired_capabilities = desired_capabilities
         self.which_browser = browser
+        self.in_page_interactables = in_page_interactables
 
 
     def __repr__(self):
@@ -257,6 +907,21 @@ class BrowserHelper:
             . user_data_dir         - path/to/chrome/profile    - string
             . disable_infobars      - True/False                - boolean
                                                                     (default=True)
+            . block_resources       - ["images", "*ads.com*"]   - list
+                    resources to not download at all, any of:
+                        images, media, fonts, stylesheets, ads
+                    and/or url patterns with * as wildcard.
+
+                    chrome blocks them with devtools network blocking,
+                    (see _block_resources_if_necessary method),
+                    firefox uses preferences, it does not support url
+                    patterns, and for ads uses its tracking protection.
+            . page_timeout          - seconds                   - number
+                    maximum time of page load, after it page loading
+                    is stopped and we continue with what is loaded
+                    (see _apply_timeouts method)
+            . script_timeout        - seconds                   - number
+                    maximum time of asynchronous javascript calls
         '''
         if self.which_browser == "chrome":
             from selenium.webdriver.chrome.options import Options
@@ -264,6 +929,7 @@ class BrowserHelper:
             from selenium.webdriver.firefox.options import Options
 
         self.browser_options = Options()
+        self._blocked_url_patterns = []
 
         # things to change by default
         self.browser_options.add_argument("--disable-infobars")
@@ -306,8 +972,20 @@ class BrowserHelper:
                 # display or not images
                 elif key == "hide_images":
                     if value:
-                        self.browser_options.add_argument(
-                            '--blink-settings=imagesEnabled=false')
+                        if self.which_browser == "firefox":
+                            self.browser_options.set_preference(
+                                            "permissions.default.image", 2)
+                        else:
+                            self.browser_options.add_argument(
+                                '--blink-settings=imagesEnabled=false')
+
+                # do not download some resources at all
+                elif key == "block_resources":
+                    self._add_block_resources_options(value)
+
+                # applied after launch, see _apply_timeouts
+                elif key in ["page_timeout", "script_timeout"]:
+                    pass
 
                 # disable or not javascript
                 elif key == "disable_javascript":
@@ -345,45 +1023,359 @@ class BrowserHelper:
                         . disable_javascript
                         . proxy
                         . user_data_dir
-                        . disable_infobars""")
+                        . disable_infobars
+                        . block_resources""")
 
                     raise Exception(exc_text)
 
 
+    def _add_block_resources_options(self, resources):
+        '''
+        prepare blocking of given resources(see block_resources
+        option in _add_necessary_options method).
+
+        for firefox, preferences are set here, for chrome,
+        url patterns are saved to block them after launch.
+        '''
+        firefox_preferences = {
+            "images": {"permissions.default.image": 2},
+            "media": {"media.autoplay.default": 5,
+                      "media.preload.default": 0},
+            "fonts": {"browser.display.use_document_fonts": 0,
+                      "gfx.downloadable_fonts.enabled": False},
+            "stylesheets": {"permissions.default.stylesheet": 2},
+            "ads": {"privacy.trackingprotection.enabled": True},
+        }
+
+        for resource in resources:
+            if self.which_browser == "firefox":
+                if resource in firefox_preferences:
+                    for name, value in firefox_preferences[resource].items():
+                        self.browser_options.set_preference(name, value)
+                else:
+                    print(f"Url pattern {repr(resource)} can not be "
+                          "blocked on firefox, only on chrome")
+            else:
+                self._blocked_url_patterns.extend(
+                    _BLOCKED_URL_PATTERNS.get(resource, [resource]))
+
+
+    def _block_resources_if_necessary(self):
+        '''
+        block urls with patterns from block_resources option
+        using chrome devtools protocol, so requests to
+        them are cancelled before they are sent.
+        '''
+        if self._blocked_url_patterns:
+            self.br.execute_cdp_cmd("Network.enable", {})
+            self.br.execute_cdp_cmd("Network.setBlockedURLs",
+                                    {"urls": self._blocked_url_patterns})
+
+
     def _initialize_browser_if_necessary(self):
         '''
         initialize(open and assign to object) browser if necessary
         '''
         if not self.br:
             # for later use
+            self._launch_start = time.time()
+
+            if self._is_static():
+                self.br = self._new_static_driver()
+                self.keys = Keys
+                self.startup_time = time.time() - self._launch_start
+                return
 
             self._add_necessary_options()
 
-            if self.which_browser == "chrome":
-                self.br = webdriver.Chrome(executable_path=self.driver_path,
-                                           options=self.browser_options,
-                                           desired_capabilities=self.capabilities)
+            if self._launch_semaphore is not None:
+                self._launch_semaphore.acquire()
+                # do not count waiting in startup time
+                self._launch_start = time.time()
+
+            try:
+                if self.which_browser == "chrome":
+                    self.br = webdriver.Chrome(executable_path=self.driver_path,
+                                               options=self.browser_options,
+                                               desired_capabilities=self.capabilities)
+
+                elif self.which_browser == "firefox":
+                    self.br = webdriver.Firefox(executable_path=self.driver_path,
+                                                options=self.browser_options,
+                                                desired_capabilities=self.capabilities)
+            finally:
+                if self._launch_semaphore is not None:
+                    self._launch_semaphore.release()
 
-            elif self.which_browser == "firefox":
-                self.br = webdriver.Firefox(executable_path=self.driver_path,
-                                            options=self.browser_options,
-                                            desired_capabilities=self.capabilities)
             self.keys = Keys
 
+            self._wait_until_driver_ready()
+            self._block_resources_if_necessary()
+            self._apply_timeouts()
+
+
+    def _new_static_driver(self):
+        '''
+        returns _StaticDriver object with proxy and
+        page_timeout(as http timeout) from options.
+        '''
+        options = self.options or {}
+
+        return _StaticDriver(proxy=options.get("proxy"),
+                             timeout=options.get("page_timeout", 30))
+
+
+    def _apply_timeouts(self):
+        '''
+        set page_timeout and script_timeout options(if supplied)
+        on just launched browser.
+
+        without page_timeout, page that never finishes loading
+        (hanging request, endless redirects) blocks get forever,
+        with it, get stops loading page after that many seconds
+        (see _load_url method).
+        '''
+        options = self.options or {}
+
+        if options.get("page_timeout"):
+            self.br.set_page_load_timeout(options["page_timeout"])
+
+        if options.get("script_timeout"):
+            self.br.set_script_timeout(options["script_timeout"])
+
+
+    def _is_static(self):
+        '''
+        returns True if we work without real browser(browser="static"),
+        or current page was loaded without it in hybrid mode of get.
+        '''
+        return (self.which_browser == "static"
+                or isinstance(self.br, _StaticDriver))
+
+
+    def _wait_until_driver_ready(self, timeout=30, check_interval=0.05):
+        '''
+        wait until just launched browser really answers commands,
+        by asking document's state, and save time it took from
+        launch start in startup_time attribute.
+
+        arguments:
+            1. timeout - seconds to wait before raising exception
+                        (default=30)
+            2. check_interval - seconds between attempts(default=0.05)
+        '''
+        start = time.time()
+
+        while True:
+            try:
+                self.br.execute_script("return document.readyState")
+                break
+            except selenium.common.exceptions.WebDriverException:
+                if time.time() - start > timeout:
+                    raise Exception(
+                        f"Browser did not become ready in {timeout} seconds")
+                time.sleep(check_interval)
+
+        self.startup_time = time.time() - self._launch_start
+
 
     def close(self):
-        '''just close browser'''
-        self.br.quit()
+        '''
+        just close browser, or only its context and window,
+        if this object was created with new_context method.
+        '''
+        if self._static_br is not None:
+            self._static_br.quit()
+
+            if isinstance(self.br, _StaticDriver):
+                self.br = self._real_br
+
+        if self._context is not None:
+            owner, context_id = self._context
+            self._context = None
+
+            # closes context's windows too
+            owner.execute_cdp_cmd("Target.disposeBrowserContext",
+                                  {"browserContextId": context_id})
+            with self._window_lock:
+                self._window_state["current"] = None
+
+        elif self.br:
+            self.br.quit()
+
+
+    def new_context(self, proxy=None):
+        '''
+        returns new BrowserHelper object, that uses isolated context
+        (like incognito window, with its own cookies, storage, cache)
+        of this object's browser, in its own window.
+
+        it is much cheaper than launching new browser, so useful when
+        we need different sessions(accounts, regions...) at the same
+        time. contexts can be used from different threads, their
+        commands are sent one by one, each to its own window.
+        close method of returned object closes only its context.
+
+        chrome only(uses devtools Target domain), for static browser
+        new static one is returned, as it has separate cookies anyway.
+
+        arguments:
+            1. proxy - ip:port of proxy to use in this context only
+                    (default=None - same as browser's)
+        '''
+        import threading
+
+        if self._is_static():
+            options = dict(self.options or {})
+
+            if proxy:
+                options["proxy"] = proxy
+            return BrowserHelper(browser="static", options=options,
+                                 log_file=self.log_file)
+
+        if self.which_browser != "chrome":
+            raise Exception("Contexts are supported only on chrome")
+
+        self._initialize_browser_if_necessary()
+        start = time.time()
+
+        # from now on, commands of this browser also go to its window
+        if self._window_lock is None:
+            self._window_lock = threading.RLock()
+            self._window_state = {
+                    "current": self.br.current_window_handle,
+                    # same as get's default ready_timeout
+                    "page_timeout": (self.options or {}).get(
+                                                "page_timeout") or 30}
+            self.br = _bind_driver_to_window(
+                                    self.br, self._window_state["current"],
+                                    self._window_lock, self._window_state)
+
+        context_id = self.br.execute_cdp_cmd(
+                        "Target.createBrowserContext",
+                        {"proxyServer": proxy} if proxy else {}
+                        )["browserContextId"]
+        target_id = self.br.execute_cdp_cmd(
+                        "Target.createTarget",
+                        {"url": "about:blank",
+                         "browserContextId": context_id})["targetId"]
+
+        # chromedriver's window handles are made from target ids
+        handle = None
+
+        while handle is None and time.time() - start < 10:
+            handle = next((handle for handle in self.br.window_handles
+                           if handle.upper().endswith(target_id.upper())),
+                          None)
+
+            if handle is None:
+                time.sleep(0.05)
+
+        if handle is None:
+            raise Exception("Window of new context was not found")
+
+        context = BrowserHelper(browser=self.which_browser,
+                                driver_path=self.driver_path,
+                                options=self.options,
+                                log_file=self.log_file,
+                                in_page_interactables=(
+                                            self.in_page_interactables))
+        context.br = _bind_driver_to_window(self.br, handle,
+                                            self._window_lock,
+                                            self._window_state)
+        context.keys = Keys
+        context.startup_time = time.time() - start
+        context._context = (self.br, context_id)
+        context._window_lock = self._window_lock
+        context._window_state = self._window_state
+        context._blocked_url_patterns = getattr(
+                                    self, "_blocked_url_patterns", [])
+        context._block_resources_if_necessary()
+
+        return context
+
+
+    def is_alive(self):
+        '''
+        returns True if browser is launched and still responds,
+        otherwise False(not launched, crashed or closed).
+        '''
+        if not self.br:
+            return False
+
+        try:
+            self.br.current_url
+            return True
+        except Exception:
+            return False
+
+
+    def memory_usage(self, children=None):
+        '''
+        returns memory usage(RSS, in MB) of browser, by summing
+        memory of driver process and all its child processes
+        (browser itself, renderers...).
+
+        Information is read from /proc, so it works on Linux only,
+        in other cases, or if browser is not launched, None is returned.
+
+        arguments:
+            1. children - result of _proc_children function, to not
+                        read it again when checking many browsers at
+                        once(default=None - read it now)
+        '''
+        # in hybrid mode, current page may be static one
+        driver = self._real_br if isinstance(self.br, _StaticDriver) else self.br
 
+        try:
+            pid = driver.service.process.pid
+        except AttributeError:
+            return None
+
+        if not os.path.isdir("/proc"):
+            return None
+
+        if children is None:
+            children = _proc_children()
+
+        return _process_tree_memory(pid, children)
 
-    def _get_interactables(self, webelements):
+
+    def _get_interactables(self, webelements, in_page=None):
         '''
         get list of webelements(selected with xpath/css)
         and return only those, which seems interactable.
 
+        arguments:
+            1. webelements - list of webelements to check
+
+            2. in_page - if set to True, all elements are checked in one
+                        javascript call(see _JS_IS_INTERACTABLE), otherwise
+                        with is_displayed & is_enabled methods, which costs
+                        2 requests per element(default=None - use
+                        in_page_interactables attribute's value).
+
         # method needs refinement #
         '''
-        return [i for i in webelements if i.is_displayed() and i.is_enabled()]
+        if in_page is None:
+            in_page = self.in_page_interactables
+
+        # no javascript on static pages, but checks are cheap there
+        if self._is_static():
+            in_page = False
+
+        if not in_page:
+            return [i for i in webelements
+                    if i.is_displayed() and i.is_enabled()]
+
+        if not webelements:
+            return []
+
+        return self.br.execute_script(
+            f'var isInteractable = {_JS_IS_INTERACTABLE}; '
+            'return arguments[0].filter(function (el) '
+            '                           {return isInteractable(el)});',
+            webelements)
 
 
     def css(self,            selector,                 interactable=False,
@@ -597,8 +1589,7 @@ class BrowserHelper:
         else:
             answer = self.xpath(sel)
 
-            answer = [i for i in answer if
-                      i.is_displayed() and i.is_enabled()]
+            answer = self._get_interactables(answer)
             if not all_:
                 # raise error if no interactable element found
                 answer = answer[0]
@@ -635,7 +1626,141 @@ class BrowserHelper:
         getattr(select, call_me)(select_it)
 
 
-    def get(self, url_or_urls, add_protocol=True, callback=False):
+    def _install_network_tracker(self):
+        '''
+        on chrome, make browser add network tracker(see
+        _JS_NETWORK_TRACKER) in every new document before page's own
+        scripts run, so requests that start early are also counted.
+
+        on other browsers tracker is added when we start waiting,
+        so early requests may be missed.
+        '''
+        if self.which_browser != "chrome" or self._network_tracker_installed:
+            return
+
+        self.br.execute_cdp_cmd("Page.addScriptToEvaluateOnNewDocument",
+                                {"source": _JS_NETWORK_TRACKER})
+        self._network_tracker_installed = True
+
+
+    def wait_until_ready(self, ready="network_idle",
+                         idle_time=0.5, timeout=30):
+        '''
+        wait until page seems fully loaded, returns True if it does,
+        False if timeout seconds passed before that(static page
+        is always ready).
+
+        useful for pages that load data with javascript after load
+        event, instead of sleeping for fixed number of seconds.
+
+        arguments:
+            1. ready - what to wait for(default="network_idle"):
+                    . "network_idle" - no fetch/XHR requests in progress
+                                    and no network activity or DOM changes
+                                    for idle_time seconds
+                    . "dom_idle"     - no DOM changes for idle_time seconds
+
+            2. idle_time - seconds of silence that we consider
+                        as page being ready(default=0.5)
+
+            3. timeout - maximum number of seconds to wait(default=30)
+        '''
+        if ready not in ["network_idle", "dom_idle"]:
+            raise TypeError(
+                f"Please use network_idle or dom_idle, not {ready}")
+
+        # static page is downloaded completely, without javascript
+        if self._is_static():
+            return True
+
+        return bool(self._wait_in_page(
+                        _JS_WAIT_UNTIL_IDLE, timeout,
+                        lambda left: [idle_time, left,
+                                      ready == "network_idle"]))
+
+
+    def _load_with_static_driver(self, url, hybrid):
+        '''
+        download url without real browser(see _StaticDriver) and
+        check with hybrid argument of get method, if it is enough.
+
+        returns True if it is, so current page is static one,
+        otherwise False and real browser becomes current one again.
+        '''
+        if self._static_br is None:
+            self._static_br = self._new_static_driver()
+
+        # remember real browser(or False if it is not launched yet)
+        if not isinstance(self.br, _StaticDriver):
+            self._real_br = self.br
+
+        self.br = self._static_br
+        self._invalidate_page_cache()
+
+        # static page needs same login(cookies) as real browser has
+        if self._real_br and self._static_cookies_stale:
+            for cookie in self._real_br.get_cookies():
+                self._static_br.session.cookies.set(
+                                    cookie["name"], cookie["value"],
+                                    domain=cookie.get("domain", ""),
+                                    path=cookie.get("path", "/"))
+            self._static_cookies_stale = False
+
+        try:
+            self.br.get(url)
+
+            if isinstance(hybrid, str):
+                enough = bool(self._css_xpath(hybrid))
+            else:
+                enough = hybrid(self)
+        except Exception:
+            enough = False  # let real browser try
+
+        if enough:
+            self.fetch_stats["static"] += 1
+            return True
+
+        self.br = self._real_br
+        self.fetch_stats["browser"] += 1
+        return False
+
+
+    def _load_url(self, url, ready=None, ready_timeout=30, hybrid=None):
+        '''
+        load one url, see get method for arguments.
+        '''
+        if hybrid is not None and self._load_with_static_driver(url, hybrid):
+            return
+
+        # after static page in hybrid mode, use real browser again
+        if (isinstance(self.br, _StaticDriver)
+                and self.which_browser != "static"):
+            self.br = self._real_br
+
+        self._initialize_browser_if_necessary()
+        self._static_cookies_stale = True
+
+        try:
+            self.br.get(url)
+        except selenium.common.exceptions.TimeoutException:
+            # page_timeout passed, stop loading and use what we have
+            self.br.execute_script("window.stop();")
+            self.log_info(f"{url} stopped after page_timeout")
+
+        self._invalidate_page_cache()
+
+        # static pages do not run javascript, so they are ready at once
+        if ready and not self._is_static():
+            self._install_network_tracker()
+
+            if not self.wait_until_ready(ready, timeout=ready_timeout):
+                self.log_info(f"{url} was not {ready} "
+                              f"in {ready_timeout} seconds")
+
+
+    def get(self,            url_or_urls,       add_protocol=True,
+            callback=False,  ready=None,        ready_timeout=30,
+            hybrid=None,     prefetch=0,        lazy=False):
         '''
         load url page.
 
@@ -659,31 +1784,317 @@ class BrowserHelper:
                           with this class object as an argument.
 
                           we may use it to parse and save data somewhere.
-        '''
-        # initialize browser
-        self._initialize_browser_if_necessary()
+
+            4. ready - if supplied(default=None), after each page load
+                       we also wait until page is ready with
+                       wait_until_ready method, using this argument
+                       ("network_idle" or "dom_idle").
+                       useful for pages that load data with javascript.
+
+            5. ready_timeout - maximum seconds to wait for readiness
+                            (default=30)
+
+            6. hybrid - if supplied(default=None), each url is at first
+                        downloaded without browser(as with "static"
+                        browser), and loaded in real browser only if
+                        that page is not good enough. it can be:
+                            . css/xpath selector, that should
+                              match something on good page
+                            . function, that gets this object and
+                              returns True if page is good
+                        browser is launched only when it is needed.
+                        number of pages loaded each way is saved in
+                        fetch_stats attribute.
+
+            7. prefetch - if more than 0(default=0) and we have few
+                        urls, that many next urls are loaded in other
+                        tabs, while callback works with current page,
+                        so callback time and network time overlap.
+                        callback is still called for urls in their
+                        sequence(see get_in_tabs method). not used
+                        with ready and hybrid arguments.
+
+            8. lazy - if set to True(default=False), generator is
+                        returned, which loads urls only while we iterate
+                        over it, and yields (url, callback_result) tuples.
+                        url_or_urls can be any iterable then.
+        '''
+        # initialize browser(in hybrid mode, only if it is needed)
+        if hybrid is None:
+            self._initialize_browser_if_necessary()
 
         # convert to list if it is string
         if isinstance(url_or_urls, str):
             url_or_urls = [url_or_urls]
 
+        urls = url_or_urls
+
         # add http:// if needed
         if add_protocol:
-            for index, url in enumerate(url_or_urls):
-                if url.split("//")[0].lower() not in ["http:", "https:"]:
-                    url_or_urls[index] = "http://" + url
+            urls = (self._add_protocol(url) for url in url_or_urls)
 
-        if callback:
-            for index, url in enumerate(url_or_urls):
-                self.br.get(url)
-                callback(self)
-                if len(url_or_urls) > 1:
-                    print(f'{index + 1:^4}/{len(url_or_urls):^4}| {url} | + ')
+        results = self._iter_get(urls, callback, ready,
+                                 ready_timeout, hybrid, prefetch)
+
+        if lazy:
+            return results
+
+        for index, (url, _) in enumerate(results):
+            if hasattr(url_or_urls, "__len__") and len(url_or_urls) > 1:
+                print(f'{index + 1:^4}/{len(url_or_urls):^4}| {url} | + ')
+
+
+    def _iter_get(self, urls, callback=False, ready=None,
+                  ready_timeout=30, hybrid=None, prefetch=0):
+        '''
+        load urls one by one(or with prefetch, in tabs) and yield
+        (url, callback_result) tuples, see get method for arguments.
+        '''
+        if prefetch and ready is None and hybrid is None:
+            yield from self.get_in_tabs(urls, callback, tabs=prefetch + 1,
+                                        add_protocol=False,
+                                        timeout=ready_timeout, ordered=True)
+            return
+
+        for url in urls:
+            self._load_url(url, ready, ready_timeout, hybrid)
+            yield url, (callback(self) if callback else None)
+
+
+    def _add_protocol(self, url):
+        '''
+        returns url with http:// at the beginning,
+        if it does not start with http:// or https://
+        '''
+        if url.split("//")[0].lower() not in ["http:", "https:"]:
+            return "http://" + url
+        return url
+
+
+    def _switch_to_tab(self, handle):
+        '''
+        make tab with given window handle current one.
+        '''
+        self.br.switch_to.window(handle)
+        # cached things belong to other tab's page
+        self._invalidate_page_cache()
+
+
+    def _navigate_without_waiting(self, url):
+        '''
+        start loading url in current tab and return at once.
+        chrome does it with devtools command, others with javascript.
+        '''
+        if self.which_browser == "chrome":
+            self.br.execute_script("document.__brh_old = true;")
+            self.br.execute_cdp_cmd("Page.navigate", {"url": url})
         else:
-            for index, url in enumerate(url_or_urls):
-                self.br.get(url)
-                if len(url_or_urls) > 1:
-                    print(f'{index + 1:^4}/{len(url_or_urls):^4}| {url} | + ')
+            self.br.execute_script(_JS_NAVIGATE_LATER, url)
+
+        self._invalidate_page_cache()
+
+
+    def _run_tab_callback(self, item, callback, return_exceptions):
+        '''
+        run callback for just loaded page of get_in_tabs
+        method's item and return its result.
+        '''
+        if isinstance(item, tuple):
+            url, _meta = item
+            self.meta = dict(_meta, url=url)
+
+        try:
+            return callback(self) if callback else None
+        except Exception as error:
+            if not return_exceptions:
+                raise
+            return error
+
+
+    def get_in_tabs(self, urls, callback=False, tabs=4, add_protocol=True,
+                    timeout=30, return_exceptions=False, check_interval=0.05,
+                    ordered=False):
+        '''
+        load urls in few tabs of this browser at the same time and
+        yield (url, callback_result) tuples, in order in which
+        pages finish loading.
+
+        loading of next urls is started in all free tabs without
+        waiting, and each tab's callback is called(with this object
+        as an argument, current tab is that tab) as soon as its page is
+        ready, so network time of one page is not wasted while others
+        load or are processed. one browser with few tabs uses much
+        less memory than the same number of browsers.
+
+        it is generator, so urls are loaded while we iterate over it.
+        for browser="static", urls are just loaded one by one.
+
+        ex:
+            for url, title in br.get_in_tabs(urls, lambda br: br.br.title,
+                                             tabs=4):
+                print(url, title)
+
+        arguments:
+            1. urls - iterable of urls to load, items may also be
+                    (url, meta) tuples, in which case meta dictionary
+                    (plus url key) will be available as meta attribute
+                    in callback, as in MultiBr's callbacks, and same
+                    tuple is yielded instead of url. urls are yielded
+                    as they were loaded(with http:// added, if
+                    add_protocol is True), as in get method.
+
+            2. callback - function to call after each page loads
+                    (default=False, result is None then)
+
+            3. tabs - number of tabs to use(default=4)
+
+            4. add_protocol - add http:// to urls if necessary,
+                    as in get method(default=True)
+
+            5. timeout - if page does not finish loading in that many
+                    seconds, its loading is stopped and callback is called
+                    with what is loaded, if nothing is loaded,
+                    TimeoutException is raised(default=30).
+                    if browser shows its network error page(dns,
+                    connection errors...), WebDriverException is raised.
+
+            6. return_exceptions - if set to True, exceptions from callback
+                    or page loading are yielded as results, instead of
+                    being raised(default=False)
+
+            7. check_interval - seconds to wait between checks of tabs,
+                    when none of them is ready(default=0.05)
+
+            8. ordered - if set to True, results are yielded in sequence
+                    of urls, next urls still load in other tabs while
+                    we wait for first one(default=False)
+        '''
+        self._initialize_browser_if_necessary()
+
+        def split(item):
+            url = item[0] if isinstance(item, tuple) else item
+            return self._add_protocol(url) if add_protocol else url
+
+        # yield same urls as get does, tuples are yielded as they are
+        urls = (item if isinstance(item, tuple) else split(item)
+                for item in urls)
+
+        if self._is_static():
+            for item in urls:
+                try:
+                    self._load_url(split(item))
+                except Exception as error:
+                    if not return_exceptions:
+                        raise
+                    yield item, error
+                    continue
+
+                yield item, self._run_tab_callback(
+                                        item, callback, return_exceptions)
+            return
+
+        urls = iter(urls)
+        original = self.br.current_window_handle
+        handles = [original]
+
+        # handle --> (item, url, loading start time)
+        loading = {}
+
+        try:
+            for _ in range(tabs - 1):
+                known = set(self.br.window_handles)
+                self.br.execute_script("window.open('about:blank');")
+                handles.extend(set(self.br.window_handles) - known)
+
+            # resources are blocked per tab(devtools target)
+            for handle in handles[1:]:
+                self._switch_to_tab(handle)
+                self._block_resources_if_necessary()
+
+            free = list(handles)
+
+            while True:
+                # start loading next urls in free tabs
+                while free:
+                    item = next(urls, None)
+
+                    if item is None:
+                        break
+
+                    handle = free.pop()
+                    self._switch_to_tab(handle)
+                    loading[handle] = (item, split(item), time.time())
+
+                    try:
+                        self._navigate_without_waiting(split(item))
+                    except Exception as error:
+                        del loading[handle]
+                        free.append(handle)
+
+                        if not return_exceptions:
+                            raise
+                        yield item, error
+
+                if not loading:
+                    break
+
+                something_finished = False
+
+                for handle in list(loading):
+                    item, url, start = loading[handle]
+
+                    self._switch_to_tab(handle)
+                    state = self.br.execute_script(_JS_TAB_STATE)
+                    late = time.time() - start > timeout
+
+                    if state not in ["complete", "error"] and not late:
+                        # tabs are in sequence of urls
+                        if ordered:
+                            break
+                        continue
+
+                    del loading[handle]
+                    free.append(handle)
+                    something_finished = True
+
+                    if state in ["loading", "error"]:
+                        if state == "loading":
+                            error = selenium.common.exceptions.TimeoutException(
+                                    f"{url} did not load in {timeout} seconds")
+                        else:
+                            # same text as in get's error, so it is
+                            # network error for MultiBr too
+                            error = selenium.common.exceptions.WebDriverException(
+                                    f"net::ERR_FAILED - error page for {url}")
+
+                        if not return_exceptions:
+                            raise error
+                        yield item, error
+                        continue
+
+                    if state != "complete":
+                        # use what is loaded
+                        self.br.execute_script("window.stop();")
+                        self.log_info(f"{url} stopped after {timeout} seconds")
+
+                    yield item, self._run_tab_callback(
+                                            item, callback, return_exceptions)
+
+                if not something_finished:
+                    time.sleep(check_interval)
+        finally:
+            # close tabs that we opened
+            for handle in handles[1:]:
+                try:
+                    self.br.switch_to.window(handle)
+                    self.br.close()
+                except Exception:
+                    pass  # browser is already closed
+
+            try:
+                self._switch_to_tab(original)
+            except Exception:
+                pass
 
 
     def _b(self):
@@ -691,6 +2102,7 @@ class BrowserHelper:
         go back in history
         '''
         self.br.back()
+        self._invalidate_page_cache()
 
 
     def _f(self):
@@ -698,6 +2110,7 @@ class BrowserHelper:
         go forward in history
         '''
         self.br.forward()
+        self._invalidate_page_cache()
 
 
     def down(self):
@@ -800,24 +2213,112 @@ class BrowserHelper:
             print(line)
 
 
-    def press(self, key, elem=False):
+    def _get_body(self):
+        '''
+        returns body element of current page,
+        cached until we navigate to other page.
+        '''
+        if self._body is None:
+            self._body = self.css1("body")
+        return self._body
+
+
+    def _key_by_name(self, name):
+        '''
+        returns selenium key for given key name(space, enter, up...),
+        raises ValueError if there is no such key.
+        '''
+        key = getattr(Keys, name.upper(), None)
+
+        if name.startswith("_") or not isinstance(key, str):
+            raise ValueError(f"Unknown key name {name!r}, see "
+                             "selenium.webdriver.common.keys.Keys")
+        return key
+
+
+    def _resolve_key(self, key):
+        '''
+        returns what to send for given key: selenium key for key names
+        in angle brackets(<space>, <enter>, <up>...), given text itself
+        otherwise(selenium keys, like Keys.ENTER, are texts too), so
+        words like "end" or "home" are typed as they are.
+
+        results are cached, to not search in keys every time.
+        '''
+        if key not in self._key_cache:
+            if len(key) > 2 and key.startswith("<") and key.endswith(">"):
+                self._key_cache[key] = self._key_by_name(key[1:-1])
+            else:
+                self._key_cache[key] = key
+        return self._key_cache[key]
+
+
+    def _send_keys(self, keys, elem=False):
+        '''
+        send all given keys(already resolved) to element(or body)
+        with one request, find body again if page changed meanwhile.
+        '''
+        if elem:
+            elem.send_keys(*keys)
+            return
+
+        try:
+            self._get_body().send_keys(*keys)
+        except selenium.common.exceptions.StaleElementReferenceException:
+            self._body = None
+            self._get_body().send_keys(*keys)
+
+
+    def press(self, key, elem=False):
         '''
             Send keys to current window elements.
             # unfortunately not all of them work for now.
 
             arguments:
-                1. key - key to press, upper or lowercase
-                        (space, enter, up, down...).
-                        here we use selenium.webdriver.common.keys keys.
+                1. key - name of key to press, upper or lowercase
+                        (space, enter, up, down..., or in angle brackets,
+                        as in press_many), or selenium key itself(Keys.UP).
+                        here we use selenium.webdriver.common.keys keys,
+                        ValueError is raised for unknown key names.
 
                 2. elem - element to send press(default=False).
                         if element is not supplied, body tag will be used.
         '''
-        if not elem:
-            elem = self.css1("body")
+        if len(key) > 1:
+            key = self._key_by_name(key.strip("<>"))
+
+        self._send_keys([key], elem)
+
+
+    def press_many(self, keys, elem=False):
+        '''
+            Send many keys to element with one request to browser,
+            much faster than calling press method for each of them.
+
+            arguments:
+                1. keys - list of texts to type and/or keys to press,
+                        which are selenium keys(Keys.ENTER) or key names
+                        in angle brackets(<space>, <enter>, <up>...).
+                        ex: ["hi", "<space>", "there", Keys.ENTER]
+
+                2. elem - element to send keys to(default=False).
+                        if element is not supplied, body tag will be used.
+        '''
+        self._send_keys([self._resolve_key(key) for key in keys], elem)
 
-        key = getattr(self.keys, key.upper())
-        elem.send_keys(key)
+
+    def type_stream(self, text, elem=False):
+        '''
+            Type given text with one request to browser,
+            new line characters are sent as enter key presses.
+
+            arguments:
+                1. text - text to type
+
+                2. elem - element to type in(default=False).
+                        if element is not supplied, body tag will be used.
+        '''
+        self._send_keys([text.replace("\n", Keys.ENTER)], elem)
 
 
     def show_downloads(self):
@@ -889,25 +2390,82 @@ class BrowserHelper:
         self.get(url)
 
 
-    def bcss(self, selector):
+    def _invalidate_page_cache(self):
+        '''
+        forget everything we cached about current page,
+        called every time we navigate(get, _b, _f, r).
+        '''
+        self._soup = None
+        self._soup_dom_version = None
+        self._body = None
+
+
+    def _get_soup(self, use_cache=True):
+        '''
+        returns bs4 object of current page source.
+
+        Parsed page is cached until page changes, to check that,
+        we keep mutations counter in page(see _JS_DOM_VERSION),
+        which costs one small javascript call instead of
+        transferring and parsing whole page source again.
+
+        arguments:
+            1. use_cache - set to False to always parse fresh page source
+                            (default=True)
+        '''
+        if not use_cache:
+            self._invalidate_page_cache()
+            self._soup = bs(self.br.page_source, "lxml")
+            return self._soup
+
+        # static pages change only when we navigate
+        if self._is_static():
+            if self._soup is None:
+                self._soup = bs(self.br.page_source, "lxml")
+            return self._soup
+
+        # get version before source, so if page changes in between,
+        # next call will see different version and parse it again
+        dom_version = self.js(_JS_DOM_VERSION)
+
+        if self._soup is None or dom_version != self._soup_dom_version:
+            self._soup = bs(self.br.page_source, "lxml")
+            self._soup_dom_version = dom_version
+
+        return self._soup
+
+
+    def bcss(self, selector, use_cache=True):
         '''
         bs4 css selector method.
 
         gets elements using bs4 & whole page source
         *it seems faster in most cases than direct webelements.
+
+        parsed page source is reused while page does not change,
+        so calling it many times on same page is cheap.
+
+        arguments:
+            1. selector - css selector to use
+            2. use_cache - set to False to parse page source again,
+                            even if page seems unchanged(default=True)
         '''
-        self._soup = bs(self.br.page_source, "lxml")
-        return self._soup.select(selector)
+        return self._get_soup(use_cache).select(selector)
 
 
-    def bcss1(self, selector):
+    def bcss1(self, selector, use_cache=True):
         '''
         bs4 css1 selector method.
 
         get first match using bs4 & whole page source
         *it seems faster in most cases than direct webelements.
+
+        arguments(same as for bcss method):
+            1. selector - css selector to use
+            2. use_cache - set to False to parse page source again,
+                            even if page seems unchanged(default=True)
         '''
-        return self.bcss(selector)[0]
+        return self.bcss(selector, use_cache)[0]
 
 
     def js(self, comm):
@@ -1035,6 +2593,102 @@ class BrowserHelper:
         return self._css_xpath(selector, interactable)[0]
 
 
+    def _compile_extract_schema(self, schema):
+        '''
+        converts schema of extract method into form that javascript
+        side understands(as tuples and lists are the same for it),
+        each field becomes dictionary with keys:
+            selector, attr, many, fields
+
+        arguments:
+            1. schema - dictionary of field names and their specifications
+        '''
+        if not isinstance(schema, dict):
+            raise TypeError(
+                f"schema should be dictionary, not {type(schema).__name__}")
+
+        compiled = {}
+
+        for name, spec in schema.items():
+            many = isinstance(spec, list)
+
+            if many:
+                if len(spec) != 1:
+                    raise TypeError(
+                        f"list specification of field {repr(name)} "
+                        "should contain exactly 1 item")
+                spec = spec[0]
+
+            if isinstance(spec, str):
+                selector, what = spec, "text"
+            elif isinstance(spec, tuple) and len(spec) == 2:
+                selector, what = spec
+            else:
+                raise TypeError(
+                    f"bad specification for field {repr(name)}: {repr(spec)}")
+
+            field = {"selector": selector,  "many": many,
+                     "attr": None,          "fields": None}
+
+            if isinstance(what, dict):
+                field["fields"] = self._compile_extract_schema(what)
+            else:
+                field["attr"] = what
+
+            compiled[name] = field
+
+        return compiled
+
+
+    def extract(self, root_selector, schema, normalize=True):
+        '''
+        Extract data from current page with one javascript call,
+        instead of locating elements and asking each one about
+        its text/attributes separately.
+
+        Returns list of dictionaries(one per root_selector match)
+        with plain values, ready to be saved.
+
+        arguments:
+            1. root_selector - css or xpath selector of records
+                            (ex: "div.content"), as in _css_xpath
+                            method, xpath starts with /.
+                            if None, whole page is one record
+                            and dictionary is returned instead of list.
+
+            2. schema - dictionary of field names and specifications
+                        inside each record, where specification is:
+
+                . "selector"                - text of first match
+                . ("selector", "attr")      - attribute of first match,
+                                            "text" and "html" are also
+                                            supported as attr values
+                . ("selector", {schema})    - nested record from first match
+                . [any of the above]        - list of values for all matches
+
+                missing first matches give None.
+                selectors are css, or xpath if they start
+                with /, ./ or ../ (relative to record element).
+                empty selector ("") means record element itself.
+
+                ex:
+                    br.extract("div.content", {
+                            "title": "h2",
+                            "link": ("a", "href"),
+                            "tags": ["span.tag"],
+                            "author": ("div.author", {"name": ".name"}),
+                    })
+
+            3. normalize - if set to True(default), whitespace in strings
+                        will be collapsed to single spaces and stripped.
+        '''
+        return self.br.execute_script(
+                        _JS_EXTRACT,
+                        root_selector,
+                        self._compile_extract_schema(schema),
+                        normalize)
+
+
     def _print_error(self):
         '''
         prints error using traceback module's format_exc method
@@ -1044,7 +2698,8 @@ class BrowserHelper:
 
 
     def login(self,             url,       login_info=("username", "password"),
-              selectors=None,   seconds=1):
+              selectors=None,   seconds=1, ready=None,
+              ready_timeout=30):
         '''
         # still in development #
 
@@ -1090,18 +2745,27 @@ class BrowserHelper:
                         something goes wrong, function will return False
 
             4. seconds - number of seconds to wait page to load completely
-                         (default = 1). We want to make this process dynamic
-                         & more reliable in the future.
+                         (default = 1), not used if ready argument is supplied.
+
+            5. ready - if supplied("network_idle" or "dom_idle"), instead
+                        of sleeping, we wait until page is ready using
+                        wait_until_ready method(default=None).
+
+            6. ready_timeout - maximum number of seconds to wait for
+                        readiness, if ready is supplied. if page is not
+                        ready after that, it is logged and we continue
+                        anyway(default=30)
         '''
         # logged in status
         status = False
         username, password = login_info
 
         try:
-            self.get(url)
-            # later add more reliable method
-            # to let browser fully render js & load
-            time.sleep(seconds)
+            # let browser fully render js & load
+            self.get(url, ready=ready, ready_timeout=ready_timeout)
+
+            if not ready:
+                time.sleep(seconds)
 
             # generate possible selectors if necessary
             _sel = ["username", "password", "submit"]
@@ -1131,8 +2795,12 @@ class BrowserHelper:
             elems["password"].send_keys(password)
             self.click(elems["submit"])
 
-            # later add more reliable method
-            time.sleep(seconds)
+            if not ready:
+                time.sleep(seconds)
+
+            elif not self.wait_until_ready(ready, timeout=ready_timeout):
+                self.log_info(f"page after login was not {ready} "
+                              f"in {ready_timeout} seconds")
 
             # check if logged in successfully
             # if this selector is not present, check
@@ -1157,11 +2825,163 @@ class BrowserHelper:
         return status
 
 
+    def save_session(self, path):
+        '''
+        save current website's session(cookies, localStorage
+        and sessionStorage) in json file, to restore it later with
+        load_session method, for example in other browsers,
+        so they do not need to log in again.
+
+        arguments:
+            1. path - json file path to save session in
+        '''
+        get_storage = ('var data = {}; var storage = window[arguments[0]]; '
+                       'for (var i = 0; i < storage.length; i++) '
+                       '    {data[storage.key(i)] = '
+                       '                storage.getItem(storage.key(i))}; '
+                       'return data;')
+        session = {
+            "url": self.br.current_url,
+            "origin": self._get_current_domain(),
+            "saved_at": time.time(),
+            "cookies": self.br.get_cookies(),
+            "local_storage": self.br.execute_script(
+                                            get_storage, "localStorage"),
+            "session_storage": self.br.execute_script(
+                                            get_storage, "sessionStorage"),
+        }
+
+        with open(path, "w") as f:
+            json.dump(session, f, ensure_ascii=False, indent=4)
+
+
+    def _is_session_stale(self, session, max_age=None, auth_cookies=None):
+        '''
+        returns True if saved session seems outdated: it is older
+        than max_age seconds, or some of auth_cookies(names of cookies
+        that keep us logged in) are missing or already expired.
+
+        other cookies are not checked, as short living ones(analytics,
+        csrf...) are issued again by website anyway.
+        '''
+        now = time.time()
+
+        if max_age is not None and now - session["saved_at"] > max_age:
+            return True
+
+        if not auth_cookies:
+            return False
+
+        expiries = {cookie["name"]: cookie.get("expiry", now + 1)
+                    for cookie in session["cookies"]}
+
+        return any(expiries.get(name, now) <= now for name in auth_cookies)
+
+
+    def load_session(self, path, max_age=None, auth_cookies=None):
+        '''
+        restore session saved with save_session method. Browser
+        will be on session's website's home page after that, reloaded
+        after cookies and storage are restored, so page is the logged
+        in one(if session still works).
+
+        returns True if session was restored, False if file does
+        not exist, or session is stale(see _is_session_stale method).
+
+        arguments:
+            1. path - json file path where session was saved
+            2. max_age - sessions older than that(in seconds)
+                        are considered stale(default=None - any age)
+            3. auth_cookies - names of cookies that keep us logged in,
+                        session is stale if some of them are missing or
+                        expired(default=None - do not check cookies)
+        '''
+        if not os.path.exists(path):
+            return False
+
+        with open(path) as f:
+            session = json.load(f)
+
+        if self._is_session_stale(session, max_age, auth_cookies):
+            return False
+
+        # cookies and storage can be set only on their website
+        self.get(session["origin"], add_protocol=False)
+        self.br.delete_all_cookies()
+
+        cookie_keys = ["name", "value", "path", "domain",
+                       "secure", "httpOnly", "expiry", "sameSite"]
+
+        for cookie in session["cookies"]:
+            try:
+                self.br.add_cookie(
+                    {k: v for k, v in cookie.items() if k in cookie_keys})
+            except selenium.common.exceptions.WebDriverException:
+                pass  # cookies of other domains can not be added from here
+
+        self.br.execute_script(
+            'var data = arguments[0]; '
+            'Object.keys(data.local_storage).forEach(function (key) '
+            '   {localStorage.setItem(key, data.local_storage[key])}); '
+            'Object.keys(data.session_storage).forEach(function (key) '
+            '   {sessionStorage.setItem(key, data.session_storage[key])});',
+            session)
+
+        # page was loaded without them
+        self.r()
+
+        return True
+
+
+    def ensure_session(self,            path,               login_args=None,
+                       check=None,      max_age=None,
+                       auth_cookies=None):
+        '''
+        make sure that we are logged in, with as little work as possible:
+        restore saved session if it is still fresh, otherwise log in
+        with login method and save new session for next time.
+
+        returns True if we seem to be logged in, False otherwise.
+
+        arguments:
+            1. path - json file path of saved session(see save_session)
+
+            2. login_args - dictionary of arguments for login method,
+                        to use when session needs to be created again
+                        (default=None - do not log in)
+
+            3. check - function that gets this object and returns True
+                        if restored session still works(logged in), it is
+                        called on website's home page, already reloaded
+                        with restored session(default=None - trust
+                        restored session)
+
+            4. max_age - sessions older than that(in seconds)
+                        are considered stale(default=None - any age)
+
+            5. auth_cookies - names of cookies that keep us logged in,
+                        see load_session method(default=None)
+        '''
+        if self.load_session(path, max_age, auth_cookies):
+            if check is None or check(self):
+                return True
+
+        if login_args is None:
+            return False
+
+        if self.login(**login_args):
+            self.save_session(path)
+            return True
+
+        return False
+
+
     def r(self):
         '''
         refresh page
         '''
         self.br.refresh()
+        self._invalidate_page_cache()
 
 
     def _editable(self):
@@ -1472,6 +3292,224 @@ class BrowserHelper:
                 self.br.execute_script("arguments[0].click()", elem)
 
 
+    def _execute_async_script(self, script, timeout, *args):
+        '''
+        execute asynchronous javascript(which calls its last argument
+        when it finishes) and return its result, allowing it to run
+        at least timeout seconds.
+
+        session's script timeout is changed only if it is not enough,
+        so short waits need one request to browser.
+        '''
+        if self._is_static():
+            raise Exception("Static browser does not run javascript, "
+                            "please use real one for this method")
+
+        # configured one, or webdriver's default(30 seconds)
+        configured = (self.options or {}).get("script_timeout") or 30
+
+        # a bit more, to let script report timeout itself
+        if timeout + 5 <= configured:
+            return self.br.execute_async_script(script, *args)
+
+        self.br.set_script_timeout(timeout + 5)
+
+        try:
+            return self.br.execute_async_script(script, *args)
+        finally:
+            self.br.set_script_timeout(configured)
+
+
+    def _wait_in_page(self, script, timeout, get_args):
+        '''
+        run waiting javascript(see _execute_async_script) and return
+        its result. if page navigates while script waits, it is
+        run again on new page, for the rest of time, and None is
+        returned if time passes that way.
+
+        arguments:
+            1. script - javascript to run
+            2. timeout - seconds to wait
+            3. get_args - function, that gets seconds left to wait
+                        and returns list of script's arguments
+        '''
+        deadline = time.time() + timeout
+
+        while True:
+            left = max(0, deadline - time.time())
+
+            try:
+                return self._execute_async_script(
+                                            script, left, *get_args(left))
+            except selenium.common.exceptions.JavascriptException as error:
+                # other errors are errors of script itself
+                if "unloaded" not in str(error).lower():
+                    raise
+
+                if time.time() >= deadline:
+                    return None
+
+
+    def _check_static_conditions(self, conditions):
+        '''
+        returns index of first condition(see wait_for_any) that is
+        true on current static page, or None. static page does not
+        change, so there is nothing to wait for.
+        '''
+        for index, condition in enumerate(conditions):
+            selector = condition["selector"]
+            state, value = condition["state"], condition["value"]
+
+            if state == "appear":
+                happened = bool(self._css_xpath(selector, True))
+            elif state == "disappear":
+                happened = not self._css_xpath(selector, True)
+            elif state == "text":
+                happened = any(value in element.text
+                               for element in self._css_xpath(selector))
+            else:
+                happened = len(self._css_xpath(selector)) >= value
+
+            if happened:
+                return index
+
+        return None
+
+
+    def wait_for_any(self, conditions, timeout=10):
+        '''
+        wait until one of given conditions happens on page and
+        return its index, or None if none of them happened in timeout.
+        static page does not change, so conditions are checked once.
+
+        Waiting happens inside page, with MutationObserver, so
+        we find out about changes immediately and do not
+        send requests to browser again and again.
+
+        arguments:
+            1. conditions - list of (selector, state) or
+                            (selector, state, value) tuples, where
+                            selector is css or xpath(starts with /) and
+                            state is one of:
+                                . "appear"    - interactable match exists
+                                . "disappear" - no interactable matches
+                                . "text"      - some match contains
+                                                value text
+                                . "count"     - there are at least
+                                                value matches
+
+                            ex:
+                                [("div.results", "appear"),
+                                 ("div.error", "text", "Not found")]
+
+            2. timeout - seconds to wait(default=10)
+        '''
+        states = ["appear", "disappear", "text", "count"]
+        _conditions = []
+
+        for condition in conditions:
+            selector, state, value = (tuple(condition) + (None,))[:3]
+
+            if state not in states:
+                raise TypeError(
+                    f"Please use one of {states} as state, not {state}")
+
+            if state in ["text", "count"] and value is None:
+                raise TypeError(f"{state} state needs value")
+
+            _conditions.append(
+                {"selector": selector, "state": state, "value": value})
+
+        if self._is_static():
+            return self._check_static_conditions(_conditions)
+
+        index = self._wait_in_page(_JS_WAIT_FOR, timeout,
+                                   lambda left: [_conditions, left])
+
+        return None if index in [-1, None] else index
+
+
+    def wait_for(self, selector, state="appear", value=None, timeout=10):
+        '''
+        wait until condition happens on page, returns True if it did,
+        False if timeout seconds passed before that.
+
+        see wait_for_any method for more details.
+
+        arguments:
+            1. selector - selector of element(css or xpath)
+            2. state - "appear", "disappear", "text" or "count"
+                        (default="appear")
+            3. value - text for "text" state, number for "count" state
+            4. timeout - seconds to wait(default=10)
+        '''
+        return self.wait_for_any([(selector, state, value)], timeout) == 0
+
+
+    def react(self, selector, js_handler):
+        '''
+        run javascript handler inside page every time element matching
+        selector appears or changes(and once for already existing ones),
+        without any requests from python. Handler can emit events,
+        which we get in batches with react_events method.
+
+        element changes, if something inside it changes, or it is added
+        (itself or with its parent), changes that handler makes in page
+        do not call it again.
+
+        returns reaction id, which is also in its events
+        and can be used to stop it with stop_react method.
+
+        arguments:
+            1. selector - css or xpath(starts with /) selector
+            2. js_handler - javascript function expression, that gets
+                        matching node and emit function as arguments.
+                        ex:
+                            "function (node, emit) {emit(node.innerText)}"
+        '''
+        return self.br.execute_script(_JS_REACT % js_handler, selector)
+
+
+    def react_events(self, timeout=10):
+        '''
+        wait until handlers started with react method emit
+        some events and return list of them(dictionaries with
+        "id" and "data" keys), or empty list after timeout seconds.
+
+        events are collected inside page, so we get all of them
+        with one request, as soon as first one is emitted.
+
+        if page changed(navigated) since react was called,
+        handlers do not exist anymore and exception is raised.
+
+        arguments:
+            1. timeout - maximum seconds to wait for events(default=10)
+        '''
+        events = self._execute_async_script(
+                                _JS_REACT_EVENTS, timeout, timeout)
+
+        if events is None:
+            raise Exception("No reactions on current page, "
+                            "maybe it changed after react call")
+        return events
+
+
+    def stop_react(self, reaction_id=None):
+        '''
+        stop handler started with react method,
+        or all of them if reaction_id is None.
+        '''
+        self.br.execute_script(
+            'var reactionId = arguments[0]; '
+            'var state = window.__brh_react; '
+            'if (!state) { return; } '
+            'Object.keys(state.observers).forEach(function (id) { '
+            '    if (reactionId === null || Number(id) === reactionId) { '
+            '        state.observers[id].disconnect(); '
+            '        delete state.observers[id]; }});',
+            reaction_id)
+
+
     def wait_until_disappears(self,
                               selector,
                               check_interval=0.5,
@@ -1479,21 +3517,27 @@ class BrowserHelper:
         '''
         wait until specific element disappears from page.
         check if element is still interactive/visible with
-        _get_interactables method.
+        wait_for method, so we find out about it immediately.
+
+        static page does not change, so exception is raised
+        if element is there.
 
         arguments:
             1. selector - selector of element(css or xpath)
 
-            2. check_interval - time interval before next
-                            attempt of element search on page.
-                            (default=0.5)
+            2. check_interval - interval of printed progress
+                            messages while we wait(default=0.5)
 
             3. print_progress - if set to False, function will not print
                             that it waits (default=True)
         '''
-        while self._css_xpath(selector, interactable=True):
+        while not self.wait_for(selector, "disappear",
+                                timeout=check_interval):
+            if self._is_static():
+                raise Exception(f"{selector} will not disappear "
+                                "from static page")
+
             if print_progress: print("waiting...")
-            time.sleep(check_interval)
         return
 
 
@@ -1533,235 +3577,2004 @@ class BrowserHelper:
         return urls
 
 
-    def download_sitemap_files(self,
-                               sitemap_url,
-                               allowed_extensions=['zip', 'gz'],
-                               ):
+    def _get_http_session(self, pool_size=10):
         '''
-        Loads sitemap page, and opens
-        each link individually to download that file.
-
-        To wait for all downloads, it is better to write
-        small script by yourself, that checks number of files
-        in necessary folder and does what you want.
+        returns requests session with same cookies, user agent and proxy
+        as browser has, to download files directly, without browser.
 
         arguments:
-            1. sitemap_url - url of sitemap page
-            2. allowed_extensions - to get link from loc tag,
-                                    It needs to be ended with one of
-                                    allowed extensions (default=['zip', 'gz']).
+            1. pool_size - number of connections to keep open per host
+                        (default=10)
         '''
-        # load page
-        self.get(sitemap_url)
+        options = self.options or {}
+        session = _new_http_session(pool_size, options.get("proxy"))
 
-        urls = self._parse_sitemap_urls(allowed_extensions)
+        if not self.br:
+            return session
 
-        print(f'| {len(urls)} urls found |'.center(50, "="))
+        if isinstance(self.br, _StaticDriver):
+            session.headers["User-Agent"] = self.br.session.headers[
+                                                                "User-Agent"]
+        else:
+            session.headers["User-Agent"] = self.js(
+                                            "return navigator.userAgent")
 
-        # get home page, to avoid multiple file downloads prompt
-        self.home()
+        for cookie in self.br.get_cookies():
+            session.cookies.set(cookie["name"], cookie["value"],
+                                domain=cookie.get("domain", ""),
+                                path=cookie.get("path", "/"))
+        return session
 
-        # open pages - download files
-        self.get(urls)
 
+    def _download_file(self, session, url, folder, chunk_size=1024 ** 2):
+        '''
+        download file from url in given folder, using given requests
+        session and return its path.
 
-####################################################
+        file name is url's file name with short hash of whole url
+        (ex: report_1a2b3c4d.pdf), so different urls with same
+        file name(/2020/report.pdf, /2021/report.pdf, ?id=1...)
+        do not overwrite each other.
 
-class MultiBr:
-    '''
-    class to use multiple browser_helper instances at the same time.
-    '''
+        data is written in file with .part extension first, if it
+        already exists(from interrupted download), we ask server
+        only for the rest of file(http Range header), if server says
+        that there is no rest, size of file is checked and if it is
+        different, file is downloaded again from the beginning.
+        existing complete files are not downloaded again.
 
-    def __init__(self, save_format="jl", indent_jl=True):
+        arguments:
+            1. session - requests session to use
+            2. url - file url
+            3. folder - folder to save file in
+            4. chunk_size - bytes to write at once(default=1MB)
         '''
-        # !
-        Make sure that driver path is written in br_helper module
-        before start using this class.
-        ! #
-
-        Arguments:
-            1. save_format - jl or csv, format in which will save
-                            data automatically, if needed(default="jl")
+        import hashlib
+        from urllib.parse import urlparse, unquote
 
-                            . if we choose jl, callback should return
-                            dictionary to save in jl file
-                            . for csv, callback should return two lists,
-                            first for data that we want to save and second
-                            for headers data, that will be added if needed
+        name = unquote(os.path.basename(urlparse(url).path)) or "download"
+        stem, extension = os.path.splitext(name)
+        url_hash = hashlib.sha1(url.encode()).hexdigest()[:8]
 
-            2. indent_jl - indent or not json lines data(default=True)
-        '''
-        if save_format.upper() not in ["CSV", "JL"]:
-            raise Exception("PLease use CSV or JL "
-                            "for save_format argument value!")
-        self.save_format = save_format
-        self.indent_jl = indent_jl
+        path = os.path.join(folder, f"{stem}_{url_hash}{extension}")
+        part_path = path + ".part"
 
-        extension = 'jl' if save_format.upper() == "JL" else "csv"
-        self.filename = f"data_{time.ctime()}.{extension}"
+        if os.path.exists(path):
+            return path
 
+        downloaded = (os.path.getsize(part_path)
+                      if os.path.exists(part_path) else 0)
+        headers = {"Range": f"bytes={downloaded}-"} if downloaded else {}
 
-    def _split_urls_list(self, urls, number):
-        '''
-        split given urls list(not set!) into sublists, each one
-        containing approximately same number of urls.
+        with session.get(url, headers=headers,
+                         stream=True, timeout=60) as response:
+            # range is not satisfiable, so we may already have everything
+            if response.status_code == 416:
+                total = response.headers.get(
+                                "Content-Range", "").rpartition("/")[2]
 
-        For more convenience, result is the dictionary
-        with numbers from 0 to given (number - 1) as keys
-        and appropriate sublists as values.
+                if total.isdigit() and int(total) == downloaded:
+                    os.replace(part_path, path)
+                    return path
 
-        useful when using multiple processes, to pass
-        these sublists as separate arguments.
-        '''
-        # breakpoint()
-        link_num_per_proc = len(urls) // number
+                # part is not beginning of this file(it changed...)
+                os.remove(part_path)
+                return self._download_file(session, url, folder, chunk_size)
 
-        if len(urls) % number != 0:
-            link_num_per_proc += 1
+            response.raise_for_status()
 
-        lists = {i: [] for i in range(number)}
+            # server may ignore range, then start from the beginning
+            mode = "ab" if response.status_code == 206 else "wb"
 
-        for num in lists:
-            add_me = urls[
-                num * link_num_per_proc: (num + 1) * link_num_per_proc]
-            lists[num].extend(add_me)
+            with open(part_path, mode) as f:
+                for chunk in response.iter_content(chunk_size):
+                    f.write(chunk)
 
-        return lists
+        os.replace(part_path, path)
+        return path
 
 
-    def _add_csv_line_in_csv_file(self, headers, text_items):
+    def download_files(self, urls, folder=None, parallel=4,
+                       return_exceptions=False):
         '''
-        add line with given text_items in csv file.
-        We do this after loading each individual url
-        to save data that was returned from callback function
+        download files from given urls directly(without opening them
+        in browser), with browser's cookies and user agent, parallel
+        parallel downloads at a time. interrupted downloads are resumed
+        next time(see _download_file method).
+
+        returns list of downloaded files paths, in same sequence as
+        urls, when all downloads finish.
 
-        we also need headers, as we may need
-        to add it if not already added using other
-        process/thread.
         arguments:
-            1. headers - headers row items(list) -
-                        will be added if we write in
-                        file first time.
-            2. text_items - list of items to write in a row.
-                            Also could be list of lists to write
-                            more than one row per page.
-        '''
-        # breakpoint()
-        write_headers = not os.path.exists(self.filename)
-        # print("write_headers:", write_headers)
+            1. urls - list of file urls
+            2. folder - folder to save files in(default=None - browser's
+                        download_location option, or current directory)
+            3. parallel - maximum number of downloads at the same time
+                        (default=4)
+            4. return_exceptions - if set to True, error of failed
+                        download is put in returned list instead of its
+                        path, otherwise, if some downloads fail, exception
+                        with their urls is raised, after others finish
+                        (default=False)
+        '''
+        from concurrent.futures import ThreadPoolExecutor, as_completed
+
+        if folder is None:
+            folder = (self.options or {}).get("download_location", os.getcwd())
+        os.makedirs(folder, exist_ok=True)
+
+        session = self._get_http_session(pool_size=parallel)
+        urls = list(urls)
+        paths = [None] * len(urls)
+        failed = []
+
+        with ThreadPoolExecutor(max_workers=parallel) as executor:
+            futures = {
+                executor.submit(self._download_file, session, url, folder): i
+                for i, url in enumerate(urls)}
+
+            for index, future in enumerate(as_completed(futures)):
+                i = futures[future]
+                try:
+                    paths[i] = future.result()
+                    status = "+"
+                except Exception as error:
+                    paths[i] = error
+                    failed.append(urls[i])
+                    status = f"- ({error})"
+                print(f'{index + 1:^4}/{len(futures):^4}| {urls[i]} | {status}')
 
-        with open(self.filename, "a") as f:
-            writer = csv.writer(f, delimiter=",")
-            # headers
-            if write_headers:
-                # print("written headers", headers)
-                writer.writerow(headers)
-            # new row
-            if text_items:
-                if not isinstance(text_items[0], (list, tuple, set)):
-                    # print("changed to list")
-                    text_items = [text_items]
+        session.close()
 
-                for row_items in text_items:
-                    # print("written row", row_items)
-                    writer.writerow(row_items)
+        if failed and not return_exceptions:
+            raise Exception(f"{len(failed)} downloads failed: {failed}")
 
+        return paths
 
-    def _add_line_in_jl_file(self, text, indent=True):
-        '''
-        add line in json lines file,
-        we do this after loading each individual url
-        to save data that was returned from callback function
 
-        arguments:
-            1. text - text to write in file
-            2. indent - indent text or not(default=True, with value 4)
+    def download_sitemap_files(self,
+                               sitemap_url,
+                               allowed_extensions=['zip', 'gz'],
+                               folder=None,
+                               parallel=4,
+                               return_exceptions=False,
+                               ):
+        '''
+        Reads sitemap(see iter_sitemap_urls function, sitemap indexes
+        and gzipped sitemaps are also supported), and downloads each file
+        it links to directly(see download_files method), parallel
+        files at a time.
+
+        Returns list of downloaded files paths, after all downloads finish.
+
+        arguments:
+            1. sitemap_url - url of sitemap page
+            2. allowed_extensions - to get link from loc tag,
+                                    It needs to be ended with one of
+                                    allowed extensions (default=['zip', 'gz']).
+            3. folder - folder to save files in(default=None - browser's
+                        download_location option, or current directory)
+            4. parallel - maximum number of downloads at the same time
+                        (default=4)
+            5. return_exceptions - see download_files method
+                        (default=False)
+        '''
+        if sitemap_url.split("//")[0].lower() not in ["http:", "https:"]:
+            sitemap_url = "http://" + sitemap_url
+
+        session = self._get_http_session()
+        urls = [url for url in iter_sitemap_urls(sitemap_url, session=session)
+                if url.lower().split(".")[-1] in allowed_extensions]
+        session.close()
+
+        print(f'| {len(urls)} urls found |'.center(50, "="))
+
+        return self.download_files(urls, folder, parallel, return_exceptions)
+
+
+####################################################
+
+class _StaticElement:
+    '''
+    element of page downloaded by _StaticDriver, with
+    most frequently used methods of selenium's WebElement.
+    '''
+    # tags after/before which text goes on new line
+    _block_tags = {
+        "address", "article", "aside", "blockquote", "br", "dd", "div",
+        "dl", "dt", "fieldset", "figcaption", "figure", "footer", "form",
+        "h1", "h2", "h3", "h4", "h5", "h6", "header", "hr", "li", "main",
+        "nav", "ol", "p", "pre", "section", "table", "tr", "ul"}
+
+    # attributes that selenium returns as absolute urls
+    _url_attributes = {"href", "src", "action"}
+
+    def __init__(self, element, driver):
+        self._element = element
+        self._parent = driver
+
+
+    def __repr__(self):
+        ''' Representation '''
+        return f"<_StaticElement {self.tag_name}>"
+
+
+    def __eq__(self, other):
+        return (isinstance(other, _StaticElement)
+                and self._element is other._element)
+
+
+    def __hash__(self):
+        return id(self._element)
+
+
+    @property
+    def tag_name(self):
+        return self._element.tag
+
+
+    @property
+    def text(self):
+        '''
+        text of element, similar to selenium's: whitespace is collapsed,
+        block elements are on separate lines, scripts/styles are skipped.
+        '''
+        parts = []
+
+        def walk(node):
+            if not isinstance(node.tag, str) or node.tag in ["script",
+                                                             "style"]:
+                return
+
+            block = node.tag in self._block_tags
+
+            if block: parts.append("\n")
+            if node.text: parts.append(node.text)
+
+            for child in node:
+                walk(child)
+                if child.tail: parts.append(child.tail)
+
+            if block: parts.append("\n")
+
+        walk(self._element)
+
+        lines = [" ".join(line.split()) for line in "".join(parts).split("\n")]
+        return "\n".join(line for line in lines if line)
+
+
+    def get_attribute(self, name):
+        '''
+        returns attribute value, or None if it is not present.
+        urls(href, src, action) are returned as absolute ones.
+        '''
+        from lxml import html
+
+        if name == "innerHTML":
+            return ((self._element.text or "") + "".join(
+                    html.tostring(child, encoding="unicode")
+                    for child in self._element))
+        if name == "outerHTML":
+            return html.tostring(self._element, encoding="unicode",
+                                 with_tail=False)
+        if name in ["textContent", "innerText"]:
+            return self._element.text_content()
+
+        value = self._element.get(name)
+
+        if value is not None and name in self._url_attributes:
+            from urllib.parse import urljoin
+            value = urljoin(self._parent.current_url, value)
+
+        return value
+
+
+    def get_property(self, name):
+        return self.get_attribute(name)
+
+
+    def is_displayed(self):
+        '''
+        guess from attributes only, as there is no rendering
+        '''
+        style = (self._element.get("style") or "").replace(" ", "").lower()
+
+        return not (self._element.get("hidden") is not None
+                    or (self._element.tag == "input"
+                        and self._element.get("type") == "hidden")
+                    or "display:none" in style
+                    or "visibility:hidden" in style)
+
+
+    def is_enabled(self):
+        return self._element.get("disabled") is None
+
+
+    def click(self):
+        '''
+        only links can be clicked on static pages, we just follow them
+        '''
+        href = self.get_attribute("href")
+
+        if href is None:
+            raise Exception("Only links can be clicked on static pages")
+
+        self._parent.get(href)
+
+
+    def send_keys(self, *value):
+        raise Exception("Typing is not possible on static pages")
+
+
+    def find_elements_by_css_selector(self, selector):
+        return self._parent._wrap(self._element.cssselect(selector))
+
+
+    def find_elements_by_xpath(self, selector):
+        return self._parent._wrap(self._element.xpath(selector))
+
+
+    def find_element_by_css_selector(self, selector):
+        return self._parent._first(
+                        self.find_elements_by_css_selector(selector), selector)
+
+
+    def find_element_by_xpath(self, selector):
+        return self._parent._first(
+                        self.find_elements_by_xpath(selector), selector)
+
+
+class _StaticDriver:
+    '''
+    replacement of selenium's webdriver for BrowserHelper(browser="static"),
+    downloads pages with pooled http client(requests session)
+    and parses them with lxml, without running javascript.
+    '''
+
+    def __init__(self, proxy=None, pool_size=10, timeout=30, headers=None):
+        '''
+        arguments:
+            1. proxy - ip:port of proxy to use(default=None)
+            2. pool_size - number of connections to keep open per host
+                        (default=10)
+            3. timeout - seconds to wait for server(default=30)
+            4. headers - dictionary of headers to send with each request
+                        (default=None - just browser like user agent)
+        '''
+        self.session = _new_http_session(pool_size, proxy, headers)
+        self.timeout = timeout
+        self.current_url = "about:blank"
+        self.page_source = ""
+        self.response = None
+        self._tree = None
+
+        # visited urls and our position in them, for back & forward
+        self._history = []
+        self._history_index = -1
+
+
+    def _load(self, url):
+        '''
+        download page and save its information
+        '''
+        import re
+
+        response = self.session.get(url, timeout=self.timeout)
+
+        # requests uses latin-1 if server does not say charset,
+        # so look at meta tag before that
+        if "charset" not in response.headers.get("content-type", "").lower():
+            match = re.search(rb'<meta[^>]+charset=["\']?([\w-]+)',
+                              response.content[:2048], re.I)
+            response.encoding = match.group(1).decode() if match else "utf-8"
+
+        self.response = response
+        self.current_url = response.url
+        self.page_source = response.text
+        self._tree = None
+
+
+    def get(self, url):
+        self._load(url)
+
+        self._history = self._history[:self._history_index + 1]
+        self._history.append(url)
+        self._history_index += 1
+
+
+    def back(self):
+        if self._history_index > 0:
+            self._history_index -= 1
+            self._load(self._history[self._history_index])
+
+
+    def forward(self):
+        if self._history_index < len(self._history) - 1:
+            self._history_index += 1
+            self._load(self._history[self._history_index])
+
+
+    def refresh(self):
+        if self._history:
+            self._load(self._history[self._history_index])
+
+
+    @property
+    def title(self):
+        titles = self._get_tree().xpath("//title/text()")
+        return titles[0].strip() if titles else ""
+
+
+    def _get_tree(self):
+        '''
+        returns lxml tree of current page, parsed when first needed
+        '''
+        from lxml import html
+
+        if self._tree is None:
+            if not self.page_source.strip():
+                self._tree = html.fromstring("<html></html>")
+            else:
+                self._tree = html.fromstring(
+                                    self.page_source.encode("utf-8"),
+                                    parser=html.HTMLParser(encoding="utf-8"))
+        return self._tree
+
+
+    def _wrap(self, nodes):
+        '''
+        returns _StaticElement objects for elements in given lxml
+        results(xpath may also return strings, they are skipped)
+        '''
+        return [_StaticElement(node, self) for node in nodes
+                if hasattr(node, "tag") and isinstance(node.tag, str)]
+
+
+    def _first(self, elements, selector):
+        if not elements:
+            raise selenium.common.exceptions.NoSuchElementException(
+                                        f"No element matches {selector}")
+        return elements[0]
+
+
+    def find_elements_by_css_selector(self, selector):
+        return self._wrap(self._get_tree().cssselect(selector))
+
+
+    def find_elements_by_xpath(self, selector):
+        return self._wrap(self._get_tree().xpath(selector))
+
+
+    def find_element_by_css_selector(self, selector):
+        return self._first(
+                    self.find_elements_by_css_selector(selector), selector)
+
+
+    def find_element_by_xpath(self, selector):
+        return self._first(self.find_elements_by_xpath(selector), selector)
+
+
+    def execute_script(self, script, *args):
+        raise Exception("Javascript can not be used with static browser")
+
+
+    execute_async_script = execute_script
+
+
+    def get_cookies(self):
+        return [{"name": cookie.name,       "value": cookie.value,
+                 "domain": cookie.domain,   "path": cookie.path,
+                 "secure": cookie.secure}
+                for cookie in self.session.cookies]
+
+
+    def quit(self):
+        self.session.close()
+
+
+####################################################
+
+class AsyncBrowserHelper:
+    '''
+    asyncio version of BrowserHelper: same methods, but they are
+    coroutines, so many browsers can be used from one event loop.
+
+    each object has its own BrowserHelper and one thread, where all
+    its commands are run one by one(selenium is not thread safe),
+    so while one browser loads page, event loop does other things.
+
+    methods that return generators(get_in_tabs, get with lazy=True)
+    return async generators here, to use with async for.
+
+    ex:
+        br = AsyncBrowserHelper("chrome")
+        await br.get("example.com")
+        links = await br.css("a")
+
+        async for url, title in await br.get(urls, callback=get_title,
+                                             lazy=True):
+            print(url, title)
+
+        await br.close()
+    '''
+
+    def __init__(self, *args, helper=None, **kwargs):
+        '''
+        arguments are same as for BrowserHelper, or already
+        created BrowserHelper object can be supplied as helper.
+        '''
+        from concurrent.futures import ThreadPoolExecutor
+
+        self.helper = helper or BrowserHelper(*args, **kwargs)
+        self._executor = ThreadPoolExecutor(max_workers=1)
+
+
+    def __repr__(self):
+        ''' Representation '''
+        return f"< AsyncBrowserHelper ({repr(self.helper)}) >"
+
+
+    async def _run(self, function, *args, **kwargs):
+        '''
+        run function in this object's thread and return its result.
+
+        generators(get_in_tabs, get with lazy=True...) are returned as
+        async generators, which run each step in this object's thread too.
+        '''
+        import asyncio
+        import functools
+        import inspect
+
+        loop = asyncio.get_running_loop()
+
+        result = await loop.run_in_executor(
+                    self._executor, functools.partial(function, *args, **kwargs))
+
+        if inspect.isgenerator(result):
+            return self._iterate(result)
+        return result
+
+
+    async def _iterate(self, generator):
+        '''
+        yield items of generator, taking each of them in this object's
+        thread, so event loop is not blocked and browser is used
+        from one thread only.
+        '''
+        import asyncio
+
+        loop = asyncio.get_running_loop()
+        finished = object()
+
+        try:
+            while True:
+                item = await loop.run_in_executor(
+                                self._executor, next, generator, finished)
+
+                if item is finished:
+                    return
+                yield item
+        finally:
+            # let it clean up(close its tabs...) in same thread
+            await loop.run_in_executor(self._executor, generator.close)
+
+
+    def __getattr__(self, name):
+        '''
+        methods of BrowserHelper that are not defined here are
+        returned as coroutine functions too, other attributes as they are.
+        '''
+        # not created yet, do not look for it in itself
+        if name == "helper":
+            raise AttributeError(name)
+
+        attribute = getattr(self.helper, name)
+
+        if not callable(attribute):
+            return attribute
+
+        async def method(*args, **kwargs):
+            return await self._run(attribute, *args, **kwargs)
+
+        return method
+
+
+    async def get(self, *args, **kwargs):
+        ''' see BrowserHelper's get method '''
+        return await self._run(self.helper.get, *args, **kwargs)
+
+
+    async def css(self, *args, **kwargs):
+        ''' see BrowserHelper's css method '''
+        return await self._run(self.helper.css, *args, **kwargs)
+
+
+    async def css1(self, *args, **kwargs):
+        ''' see BrowserHelper's css1 method '''
+        return await self._run(self.helper.css1, *args, **kwargs)
+
+
+    async def xpath(self, *args, **kwargs):
+        ''' see BrowserHelper's xpath method '''
+        return await self._run(self.helper.xpath, *args, **kwargs)
+
+
+    async def find(self, *args, **kwargs):
+        ''' see BrowserHelper's find method '''
+        return await self._run(self.helper.find, *args, **kwargs)
+
+
+    async def js(self, *args, **kwargs):
+        ''' see BrowserHelper's js method '''
+        return await self._run(self.helper.js, *args, **kwargs)
+
+
+    async def extract(self, *args, **kwargs):
+        ''' see BrowserHelper's extract method '''
+        return await self._run(self.helper.extract, *args, **kwargs)
+
+
+    async def close(self):
+        ''' close browser and stop this object's thread '''
+        try:
+            await self._run(self.helper.close)
+        finally:
+            self._executor.shutdown(wait=False)
+
+
+####################################################
+
+class BrowserPool:
+    '''
+    class to manage launched BrowserHelper instances for workers.
+
+    each worker uses its own slot(number from 0 to size - 1), pool
+    launches browser for slot when it is needed, recycles it after
+    some number of pages or when it uses too much memory, and replaces
+    browsers that crashed, so workers do not need to care about it.
+    '''
+
+    def __init__(self, options={}, size=1,
+                 max_pages=None, max_memory_mb=None, browser="chrome",
+                 launch_concurrency=4, launch_semaphore=None,
+                 session=None, session_lock=None, lazy_launch=False,
+                 memory_check_interval=5, contexts=False):
+        '''
+        arguments:
+            1. options - options to use when creating BrowserHelper objects,
+                        one dictionary for all slots, or list of
+                        dictionaries with length of size argument.
+
+            2. size - number of slots(default=1)
+
+            3. max_pages - recycle(quit and later launch new) browser
+                        after that many pages(default=None - never)
+
+            4. max_memory_mb - recycle browser after page, if its memory
+                        usage is more than that(in MB, Linux only,
+                        see BrowserHelper's memory_usage method)
+                        (default=None - never)
+
+            5. browser - browser argument for BrowserHelper objects
+                        (default="chrome")
+
+            6. launch_concurrency - maximum number of browsers that
+                        are launching at the same time(default=4),
+                        others wait until they finish.
+
+            7. launch_semaphore - semaphore to use instead of creating
+                        new one with launch_concurrency value.
+                        useful when pool is used from different processes,
+                        in which case multiprocessing.BoundedSemaphore
+                        should be supplied(default=None).
+
+            8. session - dictionary of arguments for BrowserHelper's
+                        ensure_session method, to restore(or create)
+                        logged in session in each new browser, before
+                        it is used(default=None).
+
+            9. session_lock - lock to use, so only one browser at a time
+                        checks/creates session and others just restore it.
+                        in case of processes, multiprocessing.Lock
+                        should be supplied(default=None - new threading.Lock)
+
+            10. lazy_launch - if set to True, BrowserHelper objects are
+                        created, but real browsers are launched only when
+                        they are used(useful with hybrid mode of get method)
+                        (default=False)
+
+            11. memory_check_interval - seconds between memory checks
+                        of all browsers, done by watchdog thread(see
+                        _watch_memory method), so pages are not slowed
+                        down by them. browser over max_memory_mb is
+                        recycled after its current page. if None, memory
+                        is checked after each page instead(default=5)
+
+            12. contexts - if set to True, only one browser is launched
+                        and each slot uses its isolated context(see
+                        BrowserHelper's new_context method), with its
+                        own cookies, storage and proxy(if options has it).
+                        much less memory and launch time is needed, but
+                        slots' commands are sent one by one, and it works
+                        with threads and chrome only. max_memory_mb is
+                        not used with it, as memory of context can not be
+                        measured, only of whole browser(default=False)
+        '''
+        import threading
+
+        if contexts and max_memory_mb:
+            print("memory of contexts can not be measured separately, "
+                  "ignoring max_memory_mb")
+            max_memory_mb = None
+
+        self.options = options
+        self.size = size
+        self.max_pages = max_pages
+        self.max_memory_mb = max_memory_mb
+        self.which_browser = browser
+        self.lazy_launch = lazy_launch
+        self.memory_check_interval = memory_check_interval
+        self.contexts = contexts
+
+        # slot --> BrowserHelper object / pages loaded with it
+        self._browsers = {}
+        self._pages = {}
+
+        # slot --> maximum memory usage(MB) of its current browser,
+        # and slots whose browsers should be recycled, set by watchdog
+        self._memory_peaks = {}
+        self._over_memory = set()
+        self._watchdog = None
+        self._watchdog_stop = threading.Event()
+
+        # browser whose contexts slots use, if contexts is True
+        self._root = None
+        self._root_lock = threading.Lock()
+
+        self.session = session
+
+        self._lock = threading.Lock()
+        self._session_lock = session_lock or threading.Lock()
+        self._launch_semaphore = (
+                launch_semaphore or threading.BoundedSemaphore(
+                                                        launch_concurrency))
+        self.stats = {
+            "launches": 0,
+            "launch_times": [],
+            "recycles": 0,
+            "crashes": 0,
+            "pages": 0,
+            "pages_per_browser": [],
+            # hybrid mode pages, loaded without/with real browser
+            "static_fetches": 0,
+            "browser_fetches": 0,
+            # failed pages by kind(see MultiBr's _classify_error)
+            "timeout_failures": 0,
+            "crash_failures": 0,
+            "network_failures": 0,
+            "other_failures": 0,
+            "retries": 0,
+            # slow urls loaded again by idle workers, and
+            # how many times second attempt finished first
+            "hedges": 0,
+            "hedge_wins": 0,
+            # maximum memory usage(MB) of each browser, if max_memory_mb
+            # is used, same sequence as pages_per_browser
+            "memory_peaks_mb": [],
+        }
+
+
+    def __getstate__(self):
+        ''' locks and browsers can not be passed to other processes '''
+        state = self.__dict__.copy()
+        del state["_lock"], state["_watchdog_stop"], state["_root_lock"]
+        state["_browsers"], state["_pages"] = {}, {}
+        state["_memory_peaks"], state["_over_memory"] = {}, set()
+        state["_watchdog"], state["_root"] = None, None
+        return state
+
+
+    def __setstate__(self, state):
+        import threading
+
+        self.__dict__.update(state)
+        self._lock = threading.Lock()
+        self._watchdog_stop = threading.Event()
+        self._root_lock = threading.Lock()
+
+
+    def __repr__(self):
+        ''' Representation '''
+        return (f"< BrowserPool (size={self.size}, "
+                f"stats={repr(self.stats)}) >")
+
+
+    def _update_stats(self, **increments):
+        '''
+        increment given stats keys by given values, thread safely
+        '''
+        with self._lock:
+            for key, value in increments.items():
+                self.stats[key] += value
+
+
+    def _slot_options(self, slot):
+        '''
+        returns options dictionary to use for given slot
+        '''
+        if isinstance(self.options, dict):
+            return self.options
+        return self.options[slot]
+
+
+    def _launch(self, slot):
+        '''
+        launch new browser for given slot, when there
+        are not too many other browsers launching.
+        '''
+        if self.contexts:
+            br = self._new_context(slot)
+        else:
+            br = BrowserHelper(browser=self.which_browser,
+                               options=self._slot_options(slot))
+            # lazily launched browser uses it too, when it launches
+            br._launch_semaphore = self._launch_semaphore
+
+        if not self.lazy_launch:
+            br._initialize_browser_if_necessary()
+
+        if self.session:
+            with self._session_lock:
+                if not br.ensure_session(**self.session):
+                    print(f"Browser N:{slot} could not restore session")
+
+        # watchdog reads them from its thread
+        with self._lock:
+            self._browsers[slot] = br
+            self._pages[slot] = 0
+
+        self._start_watchdog_if_necessary()
+
+        if br.startup_time is None:
+            print(f"Browser N:{slot} will launch when needed")
+        else:
+            self._update_stats(launches=1, launch_times=[br.startup_time])
+            print(f"Browser N:{slot} ready in {br.startup_time:.2f} seconds")
+
+        return br
+
+
+    def _new_context(self, slot):
+        '''
+        returns new isolated context of pool's browser for given slot,
+        browser is launched(again, if it crashed) if necessary.
+        '''
+        with self._root_lock:
+            if self._root is None or not self._root.is_alive():
+                if self._root is not None:
+                    try:
+                        self._root.close()
+                    except Exception:
+                        pass  # already dead
+
+                options = dict(self._slot_options(slot))
+                # proxies are set per context
+                options.pop("proxy", None)
+
+                self._root = BrowserHelper(browser=self.which_browser,
+                                           options=options)
+
+                with self._launch_semaphore:
+                    self._root._initialize_browser_if_necessary()
+
+                print(f"Browser for contexts ready in "
+                      f"{self._root.startup_time:.2f} seconds")
+
+            return self._root.new_context(
+                                proxy=self._slot_options(slot).get("proxy"))
+
+
+    def _retire(self, slot):
+        '''
+        quit browser of given slot(if it is still running)
+        and forget about it
+        '''
+        # all at once, so watchdog does not see half retired slot
+        with self._lock:
+            br = self._browsers.pop(slot, None)
+            pages = self._pages.pop(slot, 0)
+            peak = self._memory_peaks.pop(slot, None)
+            self._over_memory.discard(slot)
+
+        if br is None:
+            return
+
+        if peak is not None:
+            br.log_info(f"Browser N:{slot} memory high-water mark: "
+                        f"{peak:.0f} MB after {pages} pages")
+
+        with self._lock:
+            self.stats["pages_per_browser"].append(pages)
+
+            if self.max_memory_mb:
+                self.stats["memory_peaks_mb"].append(peak)
+            self.stats["static_fetches"] += br.fetch_stats["static"]
+            self.stats["browser_fetches"] += br.fetch_stats["browser"]
+
+            # lazily launched browser was not counted in _launch
+            if self.lazy_launch and br.startup_time is not None:
+                self.stats["launches"] += 1
+                self.stats["launch_times"].append(br.startup_time)
+
+        try:
+            br.close()
+        except Exception:
+            pass  # already dead
+
+
+    def browser(self, slot):
+        '''
+        returns working browser for given slot,
+        launches new one if necessary.
+        '''
+        if slot not in self._browsers:
+            return self._launch(slot)
+        return self._browsers[slot]
+
+
+    def page_done(self, slot, failed=False, pages=1):
+        '''
+        let pool know that page was processed with slot's browser,
+        so it can decide if browser should be recycled/replaced.
+
+        arguments:
+            1. slot - slot number
+            2. failed - set to True if something went wrong,
+                        if browser does not respond after that,
+                        it will be replaced(default=False)
+            3. pages - number of processed pages, if few were
+                        processed at once(in tabs)(default=1)
+        '''
+        if slot not in self._browsers:
+            return
+
+        self._pages[slot] += pages
+        self._update_stats(pages=pages)
+
+        br = self._browsers[slot]
+
+        if failed and not br.is_alive():
+            self._update_stats(crashes=1)
+            self._retire(slot)
+
+        elif self.max_pages and self._pages[slot] >= self.max_pages:
+            self._update_stats(recycles=1)
+            self._retire(slot)
+
+        elif self.max_memory_mb:
+            if self._watchdog is not None:
+                # watchdog already checked it
+                recycle = slot in self._over_memory
+            else:
+                memory = br.memory_usage()
+                self._record_memory(slot, memory)
+                recycle = memory is not None and memory > self.max_memory_mb
+
+            if recycle:
+                self._update_stats(recycles=1)
+                self._retire(slot)
+
+
+    def _record_memory(self, slot, memory, br=None):
+        '''
+        remember memory usage(MB) of slot's browser, to know
+        its maximum, and mark slot if it is over max_memory_mb.
+
+        if br is supplied, memory is ignored when slot does not use
+        that browser anymore(it was measured before it was replaced),
+        so new browser is not recycled because of old one.
+
+        returns True if slot was marked just now.
+        '''
+        if memory is None:
+            return False
+
+        with self._lock:
+            if br is not None and self._browsers.get(slot) is not br:
+                return False
+
+            self._memory_peaks[slot] = max(
+                            memory, self._memory_peaks.get(slot, 0))
+
+            if memory > self.max_memory_mb and slot not in self._over_memory:
+                self._over_memory.add(slot)
+                return True
+
+        return False
+
+
+    def _start_watchdog_if_necessary(self):
+        '''
+        start memory watchdog thread(in this process), if
+        max_memory_mb and memory_check_interval are used
+        and it is not running yet.
+        '''
+        import threading
+
+        if not (self.max_memory_mb and self.memory_check_interval):
+            return
+
+        if not os.path.isdir("/proc"):
+            return
+
+        with self._lock:
+            if self._watchdog is not None and self._watchdog.is_alive():
+                return
+
+            self._watchdog_stop.clear()
+            self._watchdog = threading.Thread(target=self._watch_memory,
+                                              daemon=True)
+            self._watchdog.start()
+
+
+    def _watch_memory(self):
+        '''
+        every memory_check_interval seconds, check memory usage of
+        all browsers of this pool(process tree of each one is read
+        from /proc once per check), until pool is closed.
+
+        browsers are not used here, so workers are not slowed down,
+        those that use too much are only marked to be recycled by
+        page_done method, after their current page.
+        '''
+        while not self._watchdog_stop.wait(self.memory_check_interval):
+            with self._lock:
+                browsers = list(self._browsers.items())
+
+            if not browsers:
+                continue
+
+            children = _proc_children()
+
+            for slot, br in browsers:
+                # not launched yet(lazily), or already closed
+                if not br.br:
+                    continue
+
+                try:
+                    memory = br.memory_usage(children)
+                except Exception:
+                    continue  # browser is closing right now
+
+                if self._record_memory(slot, memory, br):
+                    print(f"Browser N:{slot} uses {memory:.0f} MB, "
+                          "it will be recycled after current page")
+
+
+    def merge_stats(self, stats):
+        '''
+        add stats from other pool(for example copy of this one,
+        that was used in another process) to this pool's stats.
+        '''
+        with self._lock:
+            for key, value in stats.items():
+                self.stats[key] += value
+
+
+    def close(self, slot=None):
+        '''
+        quit browser of given slot, or all browsers if slot is None
+        '''
+        slots = list(self._browsers) if slot is None else [slot]
+
+        for slot in slots:
+            self._retire(slot)
+
+        if not self._browsers:
+            self._watchdog_stop.set()
+
+            with self._root_lock:
+                if self._root is not None:
+                    self._root.close()
+                    self._root = None
+
+
+####################################################
+
+class UrlLedger:
+    '''
+    class to remember status of urls(pending, done or failed, with
+    number of attempts) in sqlite database file, so interrupted
+    get_with_multi runs can continue from where they stopped.
+    '''
+
+    def __init__(self, path, max_attempts=3):
+        '''
+        arguments:
+            1. path - sqlite database file to use(created if necessary)
+            2. max_attempts - failed urls are fetched again in next runs
+                            until they fail that many times(default=3)
+        '''
+        import threading
+        import uuid
+
+        self.path = path
+        self.max_attempts = max_attempts
+        # to know which urls were already taken in this run(duplicates)
+        self.run_id = uuid.uuid4().hex
+
+        self._local = threading.local()
+
+        self._connection().execute(
+            'CREATE TABLE IF NOT EXISTS urls ('
+            '   url         TEXT PRIMARY KEY, '
+            '   status      TEXT NOT NULL, '
+            '   attempts    INTEGER NOT NULL DEFAULT 0, '
+            '   run         TEXT, '
+            '   updated     REAL)')
+        self._connection().commit()
+
+
+    def __getstate__(self):
+        ''' connections can not be passed to other processes '''
+        state = self.__dict__.copy()
+        del state["_local"]
+        return state
+
+
+    def __setstate__(self, state):
+        import threading
+
+        self.__dict__.update(state)
+        self._local = threading.local()
+
+
+    def __repr__(self):
+        ''' Representation '''
+        return f"< UrlLedger (path={repr(self.path)}) >"
+
+
+    def _connection(self):
+        '''
+        returns sqlite connection for current thread & process
+        '''
+        import sqlite3
+
+        pid = os.getpid()
+
+        if getattr(self._local, "pid", None) != pid:
+            connection = sqlite3.connect(self.path, timeout=60)
+            # let workers write while others read
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+
+            self._local.connection = connection
+            self._local.pid = pid
+
+        return self._local.connection
+
+
+    def claim(self, url):
+        '''
+        returns True if url should be fetched in this run and
+        marks it as pending, False if it is already done, failed
+        too many times, or was already taken in this run(duplicate).
+        '''
+        connection = self._connection()
+
+        row = connection.execute(
+                'SELECT status, attempts, run FROM urls WHERE url = ?',
+                (url,)).fetchone()
+
+        if row is None:
+            connection.execute(
+                "INSERT INTO urls (url, status, run, updated) "
+                "VALUES (?, 'pending', ?, ?)", (url, self.run_id, time.time()))
+            connection.commit()
+            return True
+
+        status, attempts, run = row
+
+        if run == self.run_id or status == "done":
+            return False
+
+        if status == "failed" and attempts >= self.max_attempts:
+            return False
+
+        connection.execute(
+            "UPDATE urls SET status = 'pending', run = ?, updated = ? "
+            "WHERE url = ?", (self.run_id, time.time(), url))
+        connection.commit()
+        return True
+
+
+    def mark(self, url, status):
+        '''
+        save new status("done" or "failed") of url,
+        for failed urls number of attempts is also increased.
+        '''
+        if status not in ["done", "failed"]:
+            raise TypeError(f"Please use done or failed, not {status}")
+
+        connection = self._connection()
+        connection.execute(
+            'UPDATE urls SET status = ?, updated = ?, '
+            '                attempts = attempts + ? '
+            'WHERE url = ?',
+            (status, time.time(), int(status == "failed"), url))
+        connection.commit()
+
+
+    def urls(self, status="failed"):
+        '''
+        yield urls with given status, for example to
+        fetch urls that failed before(default status="failed")
+        '''
+        cursor = self._connection().execute(
+                        'SELECT url FROM urls WHERE status = ?', (status,))
+        for (url,) in cursor:
+            yield url
+
+
+    def counts(self):
+        '''
+        returns dictionary of statuses and number of urls with them
+        '''
+        return dict(self._connection().execute(
+                        'SELECT status, COUNT(*) FROM urls GROUP BY status'))
+
+
+####################################################
+
+class _Hedger:
+    '''
+    keeps track of urls that workers are loading right now and
+    of their load times, so idle worker can load again url that
+    takes longer than most of pages(percentile of load times),
+    instead of waiting for it. result of attempt that finishes
+    first is used, other one is ignored.
+
+    works only with threads, as state is shared in memory.
+    '''
+
+    def __init__(self, percentile=0.95, min_samples=20):
+        '''
+        arguments:
+            1. percentile - urls loading longer than this percentile
+                        of load times are hedged(default=0.95)
+            2. min_samples - do not hedge until that many urls
+                        are loaded, to know what is slow(default=20)
+        '''
+        import collections
+        import threading
+
+        self.percentile = percentile
+        self.min_samples = min_samples
+
+        self._lock = threading.Lock()
+        self._durations = collections.deque(maxlen=1000)
+
+        # token --> (start time, url, meta, attempt), and
+        # number of its attempts(original and hedge) still running
+        self._in_flight = {}
+        self._running = {}
+        self._hedged = set()
+        self._tokens = itertools.count()
+
+
+    def start(self, url, _meta, attempt):
+        '''
+        remember that url started loading, returns its token
+        to use with finish method.
+        '''
+        with self._lock:
+            token = next(self._tokens)
+            self._in_flight[token] = (time.time(), url, _meta, attempt)
+            self._running[token] = 1
+
+        return token
+
+
+    def finish(self, token, failed=False):
+        '''
+        let hedger know that attempt of url finished, returns True if
+        its result should be used: it is first successful attempt, or
+        it failed and no other attempt of that url is running anymore.
+        otherwise False, and result is ignored.
+        '''
+        with self._lock:
+            if token not in self._in_flight:
+                return False
+
+            # other attempt may still succeed
+            if failed and self._running[token] > 1:
+                self._running[token] -= 1
+                return False
+
+            start = self._in_flight.pop(token)[0]
+            del self._running[token]
+            self._hedged.discard(token)
+            self._durations.append(time.time() - start)
+
+            return True
+
+
+    def take_slow(self):
+        '''
+        returns (url, meta, attempt, 0, token) work item of url that loads
+        longer than percentile of load times and was not hedged yet,
+        or None if there is no such url.
+        '''
+        with self._lock:
+            if len(self._durations) < self.min_samples:
+                return None
+
+            durations = sorted(self._durations)
+            limit = durations[int(len(durations) * self.percentile)]
+            now = time.time()
+
+            for token, (start, url, _meta, attempt) in self._in_flight.items():
+                if token not in self._hedged and now - start > limit:
+                    self._hedged.add(token)
+                    self._running[token] += 1
+                    return (url, _meta, attempt, 0, token)
+
+
+####################################################
+
+class MultiBr:
+    '''
+    class to use multiple browser_helper instances at the same time.
+    '''
+
+    def __init__(self, save_format="jl", indent_jl=True):
+        '''
+        # !
+        Make sure that driver path is written in br_helper module
+        before start using this class.
+        ! #
+
+        Arguments:
+            1. save_format - jl or csv, format in which will save
+                            data automatically, if needed(default="jl")
+
+                            . if we choose jl, callback should return
+                            dictionary to save in jl file
+                            . for csv, callback should return two lists,
+                            first for data that we want to save and second
+                            for headers data, that will be added if needed
+
+            2. indent_jl - indent or not json lines data(default=True)
+        '''
+        if save_format.upper() not in ["CSV", "JL"]:
+            raise Exception("PLease use CSV or JL "
+                            "for save_format argument value!")
+        self.save_format = save_format
+        self.indent_jl = indent_jl
+
+        extension = 'jl' if save_format.upper() == "JL" else "csv"
+        self.filename = f"data_{time.ctime()}.{extension}"
+
+
+    def _feed_work_queue(self, work_queue, urls, meta, workers_num,
+                         batch_size=1, ledger=None, retry_queue=None):
+        '''
+        put given urls with their meta dictionaries in work queue,
+        as lists of (url, meta) tuples with at most batch_size items,
+        and after that one None per worker, to let them know
+        that there is no more work to do.
+
+        urls and meta are read lazily, so when queue is bounded,
+        only few batches are in memory at once and this method
+        waits until workers take them(it runs in separate thread).
+
+        arguments:
+            1. work_queue - queue.Queue or multiprocessing.Queue object
+            2. urls - iterable of urls to put in queue
+            3. meta - iterable of meta dictionaries,
+                        same length & sequence as urls,
+                        or None to use empty ones
+            4. workers_num - number of workers that use this queue
+            5. batch_size - number of urls to take at once(default=1)
+            6. ledger - if supplied(UrlLedger object), only urls that
+                        it allows to take will be put in queue(default=None)
+            7. retry_queue - queue where workers put failed urls to try
+                        again, stop signals are sent only after all work
+                        in both queues is done(default=None)
+        '''
+        batch = []
+        skipped = 0
+        missing = object()
+
+        if meta is None:
+            pairs = ((url, {}) for url in urls)
+        else:
+            pairs = itertools.zip_longest(urls, meta, fillvalue=missing)
+
+        try:
+            for url, _meta in pairs:
+                # lengths can not be checked before, if they are iterators
+                if url is missing or _meta is missing:
+                    print("urls and meta have different lengths, "
+                          "ignoring items after shorter one ends")
+                    break
+
+                if ledger is not None and not ledger.claim(url):
+                    skipped += 1
+                    continue
+
+                batch.append((url, _meta))
+
+                if len(batch) >= batch_size:
+                    work_queue.put(batch)
+                    batch = []
+
+            if batch:
+                work_queue.put(batch)
+
+            if skipped:
+                print(f"{skipped} urls skipped(already done or duplicates)")
+
+            # failed urls may be put in retry queue while others are
+            # processed, so stop workers only when everything is done
+            work_queue.join()
+
+            if retry_queue is not None:
+                retry_queue.join()
+
+        except Exception as error:
+            # get_with_multi raises it after workers stop
+            self._feeder_error = error
+
+        finally:
+            # stop signals, always, so workers do not wait forever
+            for _ in range(workers_num):
+                work_queue.put(None)
+
+
+    def _iter_work_batches(self, work_queue, retry_queue=None, hedger=None):
+        '''
+        yield (batch, queue) tuples, where batch is list of work items
+        to process and queue is the one it was taken from, to call
+        its task_done method when batch is processed, until stop
+        signal(None) comes.
+
+        retried urls are taken before new ones, but the ones whose
+        backoff time did not pass yet are kept aside(sorted by that time)
+        and other work is done meanwhile, so worker waits only when there
+        is nothing else to do. If there is nothing to do, hedger
+        (if supplied) is asked for slow url to load again
+        (in that case queue is None).
+        '''
+        import heapq
+        from queue import Empty
+
+        # (not_before, number, batch) of retried urls that are not due yet
+        delayed = []
+        numbers = itertools.count()
+
+        while True:
+            if delayed and delayed[0][0] <= time.time():
+                yield heapq.heappop(delayed)[2], retry_queue
+                continue
+
+            if retry_queue is not None:
+                try:
+                    batch = retry_queue.get_nowait()
+                except Empty:
+                    pass
+                else:
+                    not_before = self._unpack_work_item(batch[0])[3]
+
+                    if not_before > time.time():
+                        heapq.heappush(delayed,
+                                       (not_before, next(numbers), batch))
+                    else:
+                        yield batch, retry_queue
+                    continue
+
+            # check retried and slow urls from time to time,
+            # and do not wait longer than first delayed url needs
+            wait = 0.1
+            if delayed:
+                wait = max(0, min(wait, delayed[0][0] - time.time()))
+
+            try:
+                if retry_queue is None and hedger is None:
+                    batch = work_queue.get()
+                else:
+                    batch = work_queue.get(timeout=wait)
+            except Empty:
+                if hedger is not None:
+                    item = hedger.take_slow()
+
+                    if item is not None:
+                        yield [item], None
+                continue
+
+            if batch is None:
+                return
+
+            yield batch, work_queue
+
+
+    def _unpack_work_item(self, item):
+        '''
+        returns (url, meta, attempt, not_before, hedger_token) from
+        work item, which is (url, meta) for new urls,
+        (url, meta, attempt, not_before) for retried and
+        (url, meta, attempt, 0, hedger_token) for hedged ones.
+        '''
+        return (tuple(item) + (1, 0, None)[len(item) - 2:])
+
+
+    def _classify_error(self, br, error):
+        '''
+        returns kind of error that happened while processing page:
+            . crash - browser does not respond anymore
+            . timeout - page or script did not finish in time
+            . network - page could not be downloaded(dns, connection...)
+            . other - anything else, usually error in callback function
+        '''
+        if br.br and not br.is_alive():
+            return "crash"
+
+        if (isinstance(error, (selenium.common.exceptions.TimeoutException,
+                               TimeoutError))
+                or "Timeout" in type(error).__name__):
+            return "timeout"
+
+        # requests/socket errors, or browsers' network error pages
+        if (isinstance(error, OSError) or "net::ERR_" in str(error)
+                or "about:neterror" in str(error)):
+            return "network"
+
+        return "other"
+
+
+    def _get_csv_rows(self, text_items):
+        '''
+        returns list of rows to write in csv file from
+        data that callback function returned.
+
+        arguments:
+            1. text_items - list of items to write in a row.
+                            Also could be list of lists to write
+                            more than one row per page.
+        '''
+        if not text_items:
+            return []
+
+        if not isinstance(text_items[0], (list, tuple, set)):
+            text_items = [text_items]
+
+        return list(text_items)
+
+
+    def _get_jl_line(self, text, indent=True):
+        '''
+        returns json lines file line for data that callback returned
+
+        arguments:
+            1. text - data to write in file
+            2. indent - indent text or not(default=True, with value 4)
+        '''
+        return json.dumps(text, ensure_ascii=False,
+                          indent=4 if indent else None) + "\n"
+
+
+    def _prepare_result(self, result):
+        '''
+        check data that callback returned and convert it to what
+        _write_results writes: (headers, rows) tuple for csv,
+        json line for jl.
+
+        raises TypeError if it can not be saved, so it is error of
+        that url, instead of writer's one.
+        '''
+        if not result:
+            raise TypeError("Please return data you want to "
+                            "save from callback function")
+
+        if self.save_format.upper() != "CSV":
+            return self._get_jl_line(result, self.indent_jl)
+
+        # in case of csv, callback returns 2 lists,
+        # 1 for headers and one for actual data
+        if not (isinstance(result, (list, tuple)) and len(result) == 2):
+            raise TypeError("In case of csv, callback should return "
+                            f"(headers, rows) tuple, not {result!r}")
+
+        headers, text_items = result
+
+        if not (isinstance(headers, (list, tuple))
+                and isinstance(text_items, (list, tuple))):
+            raise TypeError("csv headers and rows should be lists, not "
+                            f"{headers!r} and {text_items!r}")
+
+        rows = self._get_csv_rows(text_items)
+
+        if not all(isinstance(row, (list, tuple, set)) for row in rows):
+            raise TypeError(f"csv rows should be lists, not {text_items!r}")
+
+        return list(headers), [list(row) for row in rows]
+
+
+    def _write_results(self, results_queue,
+                       batch_size=100, flush_interval=1):
+        '''
+        the only place where results file is written.
+
+        takes callback results that workers put in results queue
+        (already checked with _prepare_result method)
+        and writes them in file(which stays open) in batches,
+        when there are batch_size of them, or flush_interval seconds
+        passed since last write, until it gets None from queue.
+
+        in case of csv, headers are written once, if file is new/empty.
+
+        arguments:
+            1. results_queue - queue.Queue or multiprocessing.Queue object
+            2. batch_size - number of rows to collect before writing
+                            (default=100)
+            3. flush_interval - maximum number of seconds to keep
+                            rows in memory before writing(default=1)
+        '''
+        from queue import Empty
+
+        is_csv = self.save_format.upper() == "CSV"
+        write_headers = is_csv and not (os.path.exists(self.filename)
+                                        and os.path.getsize(self.filename))
+        rows = []
+        last_write = time.time()
+        finished = False
+
+        with open(self.filename, "a", newline="" if is_csv else None) as f:
+            while not finished:
+                try:
+                    result = results_queue.get(timeout=flush_interval)
+                except Empty:
+                    result = False
+
+                if result is None:
+                    finished = True
+
+                elif result is not False:
+                    if is_csv:
+                        headers, text_items = result
+
+                        if write_headers:
+                            rows.append(headers)
+                            write_headers = False
+
+                        rows.extend(text_items)
+                    else:
+                        rows.append(result)
+
+                if rows and (finished
+                             or len(rows) >= batch_size
+                             or time.time() - last_write >= flush_interval):
+                    self._write_rows(f, rows, is_csv)
+                    rows = []
+                    last_write = time.time()
+
+
+    def _write_rows(self, f, rows, is_csv):
+        '''
+        write rows in results file, if some of them can not be
+        written, they are skipped(and printed), not others.
+
+        rows are converted to text(and checked if file's encoding can
+        save it) first, one by one, and then written at once, so
+        failed write does not leave part of them in file.
         '''
-        with open(self.filename, "a") as f:
-            f.write(json.dumps(
-                        text, ensure_ascii=False,
-                        indent=4 if indent else None) + "\n")
+        import io
+
+        buffer = io.StringIO()
+        writer = csv.writer(buffer, delimiter=",")
+        lines = []
+
+        for row in rows:
+            try:
+                if is_csv:
+                    buffer.seek(0)
+                    buffer.truncate()
+                    writer.writerow(row)
+                    row = buffer.getvalue()
+
+                row.encode(f.encoding or "utf-8")
+            except Exception as error:
+                print(f"Could not write row {row!r}: {error!r}")
+                continue
+
+            lines.append(row)
+
+        f.write("".join(lines))
+        f.flush()
 
 
     def _open_new_browser_and_get_pages(
                                     self,
-                                    urls,
+                                    num,
+                                    work_queue,
+                                    pool,
                                     callback=False,
-                                    options={},
-                                    save_results=True,
-                                    meta=False):
+                                    results_queue=None,
+                                    stats_queue=None,
+                                    ledger=None,
+                                    hybrid=None,
+                                    retry_queue=None,
+                                    retry=(0, 1, ()),
+                                    hedger=None,
+                                    tabs=1):
         '''
-            opens new browser instance, gets
-            given urls and calls callback function with
-            instance of this class as an argument.
+            takes urls from work queue while there are any,
+            gets them with browser from pool and calls callback function
+            with instance of BrowserHelper class as an argument.
 
-            # we may add meta attribute to pass meta data easier
-            # that can be used in callback function later
-
-            Useful to use with get_with_multiprocessing function.
+            Useful to use with get_with_multi function.
 
             arguments:
-                1. urls - list of urls to load
+                1. num - number of worker, it is also its slot in pool
+
+                2. work_queue - queue with batches of (url, meta) tuples,
+                            filled with _feed_work_queue method.
 
-                2. callback - function to call after
+                            meta is meta data that we want to have in
+                            callback function. it will be available as
+                            browser instance's meta property and will
+                            always have at least url as key that shows
+                            requested url(not redirected)
+
+                3. pool - BrowserPool object to get browsers from
+
+                4. callback - function to call after
                               page loads with browser
                               (
                                 . locate elements
                                 . return data to save or save it directly)
 
-                3. options - options to use when creating
-                            objects from br_helper class(default={}).
+                5. results_queue - if supplied, data that callback
+                                function returns will be put there,
+                                to be saved in file by _write_results method.
 
-                4. save_results - if set to True, data that callback
-                                function returns will be saved in jl file.
-                5. meta - meta data that we want to have in each callback
-                         function. this argument should be list of dicts with
-                         same length as urls and with same sequence as urls.
-                         it will be available as browser instance's
-                         meta property and will always have at least
-                         url as key that shows requested url(not redirected)
+                6. stats_queue - if supplied(in case of processes),
+                                pool stats will be put there at the end,
+                                as pool here is just a copy.
+
+                7. ledger - if supplied(UrlLedger object), urls will be
+                            marked as done or failed there.
+
+                8. hybrid - hybrid argument for BrowserHelper's get method
+
+                9. retry_queue - queue to put failed urls in, to try
+                            them again later(default=None)
 
+                10. retry - (retries, backoff, kinds) tuple, failed url
+                            is tried again at most retries times, if kind
+                            of its error(see _classify_error) is in kinds,
+                            after backoff * 2 ** (attempt - 1) seconds
+                            (default=(0, 1, ()) - no retries)
+
+                11. hedger - _Hedger object, if we want idle workers to
+                            load slow urls again(threads only)(default=None)
+
+                12. tabs - if more than 1, urls of each batch are loaded
+                            in that many tabs of browser at the same time
+                            (see _process_batch_in_tabs)(default=1)
         '''
+        retries, backoff, retry_kinds = retry
 
-        if meta is not False:
-            if len(meta) != len(urls):
-                raise TypeError(
-                    "urls and meta arguments should have same lengths, not "
-                    f"{len(urls)} and {len(meta)}")
-        else:
-            meta = ({} for i in urls)
-
-        br = BrowserHelper(options=options)
-        for url, _meta in zip(urls, meta):
-
-            br.get(url)
-            # run callback and save answer
-            if callback:
-                # add meta info to use in callback
-                assert "url" not in meta   # do not use url in meta yourself
-
-                _meta.update({"url": url})
-
-                br.meta = _meta
-                callback_res = callback(br)
-
-                if save_results:
-                    if callback_res:
-                        if self.save_format.upper() == "CSV":
-                            # in case of csv, callback should return 2 lists,
-                            # 1 for headers and one for actual data
-                            self._add_csv_line_in_csv_file(
-                                            callback_res[0], callback_res[1])
-                        elif self.save_format.upper() == "JL":
-                            self._add_line_in_jl_file(
-                                                callback_res, self.indent_jl)
-                    else:
-                        print("Please return dictionary of data "
-                              "you want to save from callback function")
-                        exit()
+        try:
+            for batch, queue in self._iter_work_batches(
+                                        work_queue, retry_queue, hedger):
+                try:
+                    # retried and hedged urls come one by one
+                    if tabs > 1 and len(batch) > 1:
+                        self._process_batch_in_tabs(
+                                num, batch, pool, callback, results_queue,
+                                ledger, retry_queue,
+                                retries, backoff, retry_kinds, tabs)
+                        continue
+
+                    for item in batch:
+                        self._process_work_item(
+                                num, item, pool, callback, results_queue,
+                                ledger, hybrid, retry_queue,
+                                retries, backoff, retry_kinds, hedger)
+                finally:
+                    # let feeder know, that batch is processed
+                    if queue is not None:
+                        queue.task_done()
+        except Exception:
+            # urls of this worker's batch may be lost, let get_with_multi
+            # know(in case of processes, it checks exit code instead)
+            self._dead_workers.append(num)
+            raise
+        finally:
+            try:
+                # close browser after all urls are loaded
+                pool.close(num)
+            finally:
+                if stats_queue is not None:
+                    stats_queue.put(pool.stats)
+
+
+    def _process_work_item(self, num, item, pool, callback, results_queue,
+                           ledger, hybrid, retry_queue,
+                           retries, backoff, retry_kinds, hedger):
+        '''
+        get one url from work queue with slot's browser, save its result
+        or put it in retry queue if it failed, see
+        _open_new_browser_and_get_pages method for arguments.
+        '''
+        url, _meta, attempt, _, token = self._unpack_work_item(item)
+        hedge = token is not None
+
+        if hedge:
+            pool._update_stats(hedges=1)
+
+        elif hedger is not None:
+            token = hedger.start(url, _meta, attempt)
+
+        br = None
+
+        try:
+            # launching(or replacing) browser may fail too
+            br = pool.browser(num)
+            callback_res = self._get_page(br, url, _meta, callback, hybrid)
+
+            # bad result is error of this url, not of writer
+            if results_queue is not None:
+                callback_res = self._prepare_result(callback_res)
+        except Exception as error:
+            kind = "crash" if br is None else self._classify_error(br, error)
+            pool.page_done(num, failed=True)
+
+            # failure counts only if other attempt of same url
+            # is not running anymore, as it may still succeed
+            if hedger is not None and not hedger.finish(token, failed=True):
+                return
+
+            self._page_failed(pool, url, _meta, attempt, kind, error,
+                              ledger, retry_queue, retries,
+                              backoff, retry_kinds)
+            return
+
+        pool.page_done(num)
+
+        if hedger is not None:
+            if not hedger.finish(token):
+                return
+
+            if hedge:
+                pool._update_stats(hedge_wins=1)
+
+        self._page_succeeded(url, callback_res, results_queue, ledger)
+
+
+    def _process_batch_in_tabs(self, num, batch, pool, callback,
+                               results_queue, ledger, retry_queue,
+                               retries, backoff, retry_kinds, tabs):
+        '''
+        get all urls of batch with slot's browser, in few tabs at the same
+        time(see BrowserHelper's get_in_tabs method), save their results
+        or put failed ones in retry queue, see
+        _open_new_browser_and_get_pages method for arguments.
 
-        # close browser after all urls are loaded
-        br.close()
+        browser is recycled(if necessary) only after whole batch.
+        '''
+        # (url, meta) tuples for get_in_tabs and their attempt numbers
+        entries = []
+        attempts = {}
+
+        for item in batch:
+            url, _meta, attempt, _, _ = self._unpack_work_item(item)
+            assert "url" not in _meta   # do not use url in meta yourself
+
+            entries.append((url, _meta))
+            attempts[id(entries[-1])] = attempt
+
+        failed = False
+        # entries without result yet
+        unfinished = {id(entry): entry for entry in entries}
+        br = None
+
+        try:
+            # launching(or replacing) browser may fail too
+            br = pool.browser(num)
+
+            for entry, result in br.get_in_tabs(entries, callback, tabs,
+                                                add_protocol=False,
+                                                return_exceptions=True):
+                url, _meta = entry
+                unfinished.pop(id(entry), None)
+
+                if results_queue is not None and not isinstance(
+                                                        result, Exception):
+                    try:
+                        result = self._prepare_result(result)
+                    except Exception as error:
+                        result = error
+
+                if isinstance(result, Exception):
+                    failed = True
+                    kind = self._classify_error(br, result)
+                    self._page_failed(pool, url, _meta, attempts[id(entry)],
+                                      kind, result, ledger, retry_queue,
+                                      retries, backoff, retry_kinds)
+                else:
+                    self._page_succeeded(url, result, results_queue, ledger)
+
+        except Exception as error:
+            # tabs themselves failed(browser crashed or could not
+            # launch...), so all urls that did not finish yet
+            # failed, but worker continues
+            failed = True
+            kind = "crash" if br is None else self._classify_error(br, error)
+
+            for key, (url, _meta) in unfinished.items():
+                self._page_failed(pool, url, _meta, attempts[key],
+                                  kind, error, ledger, retry_queue,
+                                  retries, backoff, retry_kinds)
+        finally:
+            # browser is replaced, if it does not respond after failure
+            pool.page_done(num, failed=failed, pages=len(entries))
+
+
+    def _page_failed(self, pool, url, _meta, attempt, kind, error,
+                     ledger, retry_queue, retries, backoff, retry_kinds):
+        '''
+        print error of failed url, count it and put it in retry queue,
+        if it can be tried again, otherwise mark it as failed in ledger.
+        '''
+        import traceback
+
+        # do not stop worker because of one page
+        print(f"Error({kind}) while processing {url}")
+        traceback.print_exception(type(error), error, error.__traceback__)
+        pool._update_stats(**{f"{kind}_failures": 1})
+
+        if (retry_queue is not None and kind in retry_kinds
+                and attempt <= retries):
+            not_before = time.time() + backoff * 2 ** (attempt - 1)
+            retry_queue.put([(url, _meta, attempt + 1, not_before)])
+            pool._update_stats(retries=1)
+
+        elif ledger is not None:
+            ledger.mark(url, "failed")
+
+
+    def _page_succeeded(self, url, callback_res, results_queue, ledger):
+        '''
+        send callback's result of url(already checked with
+        _prepare_result) to writer and mark url done in ledger.
+        '''
+        if results_queue is not None:
+            results_queue.put(callback_res)
+
+        if ledger is not None:
+            ledger.mark(url, "done")
+
+
+    def _get_page(self, br, url, _meta, callback, hybrid=None):
+        '''
+        get url with given browser, call callback function
+        and return its result(None if there is no callback).
+
+        arguments are same as in _open_new_browser_and_get_pages method,
+        plus browser to use, url and its meta dictionary.
+        '''
+        br.get(url, hybrid=hybrid)
+        # run callback and return answer
+        if callback:
+            # add meta info to use in callback
+            assert "url" not in _meta   # do not use url in meta yourself
+
+            # copy, as same meta is used again if url is retried/hedged
+            br.meta = dict(_meta, url=url)
+
+            return callback(br)
 
 
     def get_with_multi(self,
@@ -1771,7 +5584,25 @@ class MultiBr:
                        urls=[],
                        callback=False,
                        save_results=False,
-                       meta=False):
+                       meta=False,
+                       batch_size=1,
+                       recycle_after_pages=None,
+                       recycle_above_mb=None,
+                       launch_concurrency=4,
+                       write_batch_size=100,
+                       flush_interval=1,
+                       ledger=None,
+                       max_attempts=3,
+                       session=None,
+                       browser="chrome",
+                       hybrid=None,
+                       retries=0,
+                       retry_backoff=1,
+                       retry_on=("timeout", "crash", "network"),
+                       hedge=False,
+                       memory_check_interval=5,
+                       tabs_per_browser=1,
+                       contexts=False):
         '''
         starts multiple processes, each of which
         does the following:
@@ -1780,13 +5611,17 @@ class MultiBr:
 
             2. opens new browser instance with given options,
 
-            3. get urls and executes callback function each time
+            3. takes next url(s) from shared queue when it is free,
+                    gets it and executes callback function each time,
+                    so slow pages do not keep other workers waiting.
 
             4. gets callback function's returned dictionary and appends
                     it in json lines file, named like
                         "data_Mon Aug  5 13:52:19 2019.jl",
                         where time shows current class creation time.
 
+        method returns when all urls are processed.
+
         arguments:
             1. multi_type - process or thread - way we want to do
                             achieve seeming/real parellelism.
@@ -1799,7 +5634,11 @@ class MultiBr:
                         with same length as number of browser
                         threads/processes.
 
-            4. urls - all urls to get data from
+            4. urls - all urls to get data from. list, any iterable
+                        (generator, iter_sitemap_urls...), or path of
+                        file with one url per line. urls are read
+                        lazily, while workers are busy, so memory usage
+                        does not depend on number of urls.
 
             5. callback - callback function to call each time after page loads,
                           with instance of this class as an
@@ -1816,43 +5655,619 @@ class MultiBr:
                             in a file or not(default=False)
 
             7. meta - meta data that we want to have in each callback
-                         function. this argument should be list of dicts with
-                         same length as urls and with same sequence as urls.
+                         function. this argument should be list(or any
+                         iterable, or path of json lines file) of dicts
+                         with same length as urls and with same sequence
+                         as urls.
                          it will be available as browser instance's
-                         _meta property and will always have at least
+                         meta property and will always have at least
                          url as key that shows requested url(not redirected)
+
+            8. batch_size - number of urls each worker takes from
+                            queue at once(default=1). bigger values
+                            mean less queue operations, but also less
+                            even distribution of work between workers.
+
+            9. recycle_after_pages - quit browser and use new one after
+                            that many pages(default=None - never).
+
+            10. recycle_above_mb - quit browser and use new one, if
+                            its memory usage becomes more than that, after
+                            its current page(in MB, Linux only). maximum
+                            memory usage of each browser is logged and
+                            saved in pool_stats(memory_peaks_mb)
+                            (default=None - never).
+
+            11. launch_concurrency - maximum number of browsers
+                            launching at the same time(default=4).
+
+            12. write_batch_size - results are written in file by one
+                            writer thread, this is number of rows
+                            it collects before writing them(default=100).
+
+            13. flush_interval - maximum number of seconds results
+                            wait in writer before they are written
+                            in file(default=1).
+
+            14. ledger - sqlite file path(or UrlLedger object) to remember
+                            which urls are done or failed, so if run stops,
+                            next run with same ledger skips done urls and
+                            tries failed ones again. duplicate urls are
+                            fetched only once(default=None - no ledger).
+
+            15. max_attempts - used with ledger, failed urls are not
+                            tried again after that many failures(default=3)
+
+            16. session - dictionary of arguments for BrowserHelper's
+                            ensure_session method, to let each browser
+                            restore saved logged in session before first
+                            url, instead of logging in every time.
+                            session is created with login once, if needed.
+                            ex:
+                                {"path": "session.json",
+                                 "login_args": {"url": "example.com/login",
+                                           "login_info": ("user", "pass")},
+                                 "max_age": 3600}
+                            (default=None)
+
+            17. browser - browser to use: "chrome", "firefox", or "static"
+                            for pages that do not need javascript
+                            (see BrowserHelper's browser argument).
+                            callbacks work the same way(default="chrome").
+
+            18. hybrid - if supplied, each url is at first downloaded
+                            without browser and loaded in real one only if
+                            needed(see hybrid argument of BrowserHelper's get
+                            method), browsers are launched only when they
+                            are needed. numbers of pages loaded each way are
+                            in pool_stats(static_fetches, browser_fetches).
+                            (default=None)
+
+            19. retries - number of times to try again url that failed
+                            (default=0). to not wait for pages that never
+                            finish loading, use page_timeout option
+                            (see BrowserHelper's _add_necessary_options).
+
+            20. retry_backoff - failed url is tried again after
+                            retry_backoff * 2 ** (attempt - 1) seconds,
+                            meanwhile worker loads other urls(default=1)
+
+            21. retry_on - kinds of errors to try again after, any of
+                            timeout, crash, network, other(errors in
+                            callback...)(see _classify_error method)
+                            (default=("timeout", "crash", "network"))
+
+            22. hedge - if set to True, worker that has nothing to do,
+                            loads again url that other worker loads longer
+                            than 95% of pages, and result of attempt that
+                            finishes first is used. useful when few slow
+                            pages make whole run slow.
+                            works only with threads(default=False)
+
+            23. memory_check_interval - seconds between memory checks
+                            of browsers, used with recycle_above_mb, they
+                            are done in background, not between pages
+                            (see BrowserPool's _watch_memory method)
+                            (default=5)
+
+            24. tabs_per_browser - if more than 1, each browser loads
+                            that many urls at the same time in its tabs
+                            (see BrowserHelper's get_in_tabs method), so
+                            fewer browsers(and less memory) are needed.
+                            batch_size becomes at least tabs_per_browser,
+                            as tabs get urls of one batch. hybrid is not
+                            used for them(default=1)
+
+            25. contexts - if set to True, only one browser is launched
+                            and each thread uses its isolated context
+                            in it(separate cookies, storage, and proxy if
+                            options list has different ones), instead of
+                            its own browser(see BrowserPool's contexts
+                            argument). works only with threads and chrome,
+                            recycle_above_mb is not used with it
+                            (default=False)
+
+        crashed browsers are replaced automatically, so one bad page
+        does not stop worker. After all urls are processed, browsers'
+        stats(launches, recycles, crashes, pages, pages per browser,
+        failures by kind, retries, hedges) are available as
+        pool_stats attribute.
         '''
 
         if multi_type == "thread":
             from threading import Thread as use_it
+            from threading import BoundedSemaphore, Lock
+            from queue import Queue
+            JoinableQueue = Queue
         elif multi_type == "process":
             from multiprocessing import Process as use_it
+            from multiprocessing import BoundedSemaphore, Lock
+            from multiprocessing import Queue, JoinableQueue
         else:
             raise TypeError(
                         f"Please use thread or process, not {multi_type}\n")
 
-        # get sublists for each process
-        splitted_urls = self._split_urls_list(urls, multi_num)
-
-        if not meta: meta = [{} for i in urls]
-        # it was not primarily for that, but lets also split metas the same way
-        metas = self._split_urls_list(meta, multi_num)
-
-        # start processes
-        for num in range(multi_num):
-            time.sleep(1)  # make 1 second intervals between process/thread
-            # breakpoint()
-            use_it(
-                target=self._open_new_browser_and_get_pages,
-                args=(
-                        splitted_urls[num],
-                        callback,
-                        options if isinstance(options, dict) else options[num],
-                        save_results,
-                        metas[num])
-                ).start()
-            print(f"{multi_type.title()} N:{num} started")
+        if isinstance(urls, str):
+            urls = iter_file_lines(urls)
+
+        if isinstance(meta, str):
+            meta = iter_file_lines(meta, as_json=True)
+
+        if meta is not False:
+            # iterators' lengths are checked while reading them
+            if (hasattr(urls, "__len__") and hasattr(meta, "__len__")
+                    and len(meta) != len(urls)):
+                raise TypeError(
+                    "urls and meta arguments should have same lengths, not "
+                    f"{len(urls)} and {len(meta)}")
+        else:
+            # empty meta dictionaries are created while reading urls
+            meta = None
+
+        if isinstance(ledger, str):
+            ledger = UrlLedger(ledger, max_attempts)
+
+        # tabs of one browser share urls of one batch
+        batch_size = max(batch_size, tabs_per_browser)
+
+        # workers take urls from here when they are free, queue is
+        # bounded, so urls are read only when workers need them
+        from threading import Thread
+
+        work_queue = JoinableQueue(maxsize=2 * multi_num)
+
+        # failed urls go here, to be tried again(not bounded, so
+        # workers never wait while putting them there)
+        retry_queue = JoinableQueue() if retries else None
+
+        self._feeder_error = None
+        self._dead_workers = []
+        feeder = Thread(target=self._feed_work_queue,
+                        args=(work_queue, urls, meta, multi_num,
+                              batch_size, ledger, retry_queue),
+                        daemon=True)
+        feeder.start()
+
+        if contexts and multi_type != "thread":
+            print("contexts work only with threads, ignoring them")
+            contexts = False
+
+        hedger = None
+
+        if hedge:
+            if multi_type == "thread":
+                hedger = _Hedger()
+            else:
+                print("hedge works only with threads, ignoring it")
+
+        # all results go to one writer through this queue
+        results_queue = None
+
+        if save_results:
+            results_queue = Queue()
+            writer = Thread(target=self._write_results,
+                            args=(results_queue,
+                                  write_batch_size,
+                                  flush_interval))
+            writer.start()
+
+        try:
+            # processes get copies of pool, so they send stats back
+            stats_queue = Queue() if multi_type == "process" else None
+
+            pool = BrowserPool(options=options,
+                               size=multi_num,
+                               max_pages=recycle_after_pages,
+                               max_memory_mb=recycle_above_mb,
+                               browser=browser,
+                               launch_semaphore=BoundedSemaphore(
+                                                        launch_concurrency),
+                               session=session,
+                               session_lock=Lock(),
+                               lazy_launch=hybrid is not None,
+                               memory_check_interval=memory_check_interval,
+                               contexts=contexts)
+
+            # start processes, they launch browsers in parallel,
+            # but not more than launch_concurrency at the same time
+            workers = []
+
+            for num in range(multi_num):
+                worker = use_it(
+                    target=self._open_new_browser_and_get_pages,
+                    args=(
+                            num,
+                            work_queue,
+                            pool,
+                            callback,
+                            results_queue,
+                            stats_queue,
+                            ledger,
+                            hybrid,
+                            retry_queue,
+                            (retries, retry_backoff, retry_on),
+                            hedger,
+                            tabs_per_browser)
+                    )
+                worker.start()
+                workers.append(worker)
+                print(f"{multi_type.title()} N:{num} started")
+
+            # get stats before join, to not block processes
+            # that want to send them(killed ones do not send them)
+            if stats_queue is not None:
+                from queue import Empty
+
+                received = 0
+
+                while received < len(workers):
+                    try:
+                        pool.merge_stats(stats_queue.get(timeout=1))
+                        received += 1
+                    except Empty:
+                        if not any(worker.is_alive() for worker in workers):
+                            break
+
+            # wait until all urls are processed
+            for worker in workers:
+                worker.join()
+
+            # workers stop early only because of their own errors,
+            # feeder still waits for urls they did not process then
+            feeder.join(timeout=1)
+
+            dead = sorted(set(self._dead_workers) | {
+                            num for num, worker in enumerate(workers)
+                            if getattr(worker, "exitcode", None)})
+        finally:
+            # let writer write everything left and finish,
+            # even in case of error, as it keeps interpreter running
+            if results_queue is not None:
+                results_queue.put(None)
+                writer.join()
+
+        # reading urls/meta failed(it is set before stop signals)
+        if self._feeder_error is not None:
+            raise self._feeder_error
+
+        if dead or feeder.is_alive():
+            raise Exception(f"{multi_type.title()}s {dead} stopped because "
+                            "of errors(see above), not all urls "
+                            "were processed")
+
+        self.pool_stats = pool.stats
+        print(f"Browsers stats: {self.pool_stats}")
+
+        if hybrid is not None:
+            static = self.pool_stats["static_fetches"]
+            total = static + self.pool_stats["browser_fetches"]
+
+            if total:
+                print(f"{static}/{total}({static / total:.0%}) pages "
+                      "loaded without browser")
+
+        if ledger is not None:
+            print(f"Urls status: {ledger.counts()}")
+
+
+    async def get_with_async(self,
+                             urls,
+                             callback=False,
+                             concurrency=4,
+                             options={},
+                             browser="chrome",
+                             meta=False,
+                             save_results=False,
+                             return_exceptions=True,
+                             launch_concurrency=4):
+        '''
+        asyncio version of get_with_multi: loads urls with concurrency
+        browsers(AsyncBrowserHelper objects) from current event loop,
+        calls callback after each page and returns list of callbacks'
+        results, in same sequence as urls.
+
+        browsers come from BrowserPool, so they are launched only when
+        there are not too many others launching, and browser that does
+        not respond after error is replaced with new one. Other pool
+        features(recycling, sessions, retries...) are not used here.
+
+        if this coroutine is cancelled, urls that are not started yet
+        are not loaded and all browsers are closed.
+
+        ex:
+            results = await MultiBr().get_with_async(
+                                    urls, callback, concurrency=10)
+
+        arguments:
+            1. urls - iterable of urls to get data from(or path of file
+                        with one url per line, as in get_with_multi)
+
+            2. callback - function to call after each page loads
+                        (default=False, or no callback). it can be:
+                            . usual function, it gets BrowserHelper object,
+                              as in get_with_multi, and runs in
+                              browser's thread.
+                            . coroutine function(async def), it gets
+                              AsyncBrowserHelper object and runs in
+                              event loop.
+                        meta(with url) is available as meta attribute
+                        of browser in both cases.
+
+            3. concurrency - number of browsers(default=4)
+
+            4. options - options to use when creating BrowserHelper
+                        objects, one dictionary, or list of them
+                        with length of concurrency(default={})
+
+            5. browser - browser to use(default="chrome")
+
+            6. meta - meta dictionaries, same length & sequence as urls,
+                        as in get_with_multi(default=False)
+
+            7. save_results - do we want to save callback's results in
+                        a file(see get_with_multi)(default=False)
+
+            8. return_exceptions - if set to True, error of url is put
+                        in results instead of its callback's result,
+                        otherwise first error stops everything and
+                        is raised(default=True)
+
+            9. launch_concurrency - maximum number of browsers that
+                        are launching at the same time(default=4)
+        '''
+        import asyncio
+
+        if isinstance(urls, str):
+            urls = iter_file_lines(urls)
+
+        if isinstance(meta, str):
+            meta = iter_file_lines(meta, as_json=True)
+
+        if (meta is not False and hasattr(urls, "__len__")
+                and hasattr(meta, "__len__") and len(meta) != len(urls)):
+            raise TypeError(
+                "urls and meta arguments should have same lengths, not "
+                f"{len(urls)} and {len(meta)}")
+
+        items = enumerate(zip(urls, meta) if meta is not False
+                          else ((url, {}) for url in urls))
+        results = {}
+
+        results_queue = None
+
+        if save_results:
+            from queue import Queue
+            from threading import Thread
+
+            results_queue = Queue()
+            writer = Thread(target=self._write_results, args=(results_queue,))
+            writer.start()
+
+        pool = BrowserPool(options, concurrency, browser=browser,
+                           launch_concurrency=launch_concurrency)
+        # slot --> AsyncBrowserHelper object, with slot's current browser
+        browsers = {}
+
+        async def work(num):
+            loop = asyncio.get_running_loop()
+
+            # items are shared, so each url is taken by one worker only
+            for index, (url, _meta) in items:
+                assert "url" not in _meta   # do not use url in meta yourself
+                failed = False
+
+                try:
+                    # launched(or replaced) in thread, when
+                    # launch semaphore allows it
+                    if num not in browsers:
+                        browsers[num] = AsyncBrowserHelper(
+                            helper=await loop.run_in_executor(
+                                                None, pool.browser, num))
+                    br = browsers[num]
+                    br.helper = await br._run(pool.browser, num)
+
+                    await br.get(url)
+                    br.helper.meta = dict(_meta, url=url)
+
+                    if not callback:
+                        result = None
+                    elif asyncio.iscoroutinefunction(callback):
+                        result = await callback(br)
+                    else:
+                        result = await br._run(callback, br.helper)
+                except Exception as error:
+                    if not return_exceptions:
+                        raise
+                    print(f"Error while processing {url}: {error!r}")
+                    result = error
+                    failed = True
+                else:
+                    if results_queue is not None:
+                        try:
+                            results_queue.put(self._prepare_result(result))
+                        except TypeError as error:
+                            print(f"Error while processing {url}: {error}")
+
+                results[index] = result
+
+                # browser that does not respond is retired here
+                if num in browsers:
+                    await browsers[num]._run(pool.page_done, num, failed)
+
+        workers = [asyncio.ensure_future(work(num))
+                   for num in range(concurrency)]
+
+        try:
+            await asyncio.gather(*workers)
+        finally:
+            # in case of error or cancellation, stop other workers too
+            for worker in workers:
+                worker.cancel()
+
+            await asyncio.gather(*workers, return_exceptions=True)
+
+            # in browsers' threads, after their current commands
+            await asyncio.gather(*[br._run(pool.close, num)
+                                   for num, br in browsers.items()],
+                                 return_exceptions=True)
+
+            for br in browsers.values():
+                br._executor.shutdown(wait=False)
+
+            loop = asyncio.get_running_loop()
+            # ones that were launching at that time
+            await loop.run_in_executor(None, pool.close)
+
+            if results_queue is not None:
+                results_queue.put(None)
+                await loop.run_in_executor(None, writer.join)
+
+        return [results[index] for index in sorted(results)]
 
 ####################################################
 # More cool functions here 
 ####################################################
+
+def _iter_sitemap_chunks(url, session, chunk_size=64 * 1024):
+    '''
+    yields sitemap xml from given url in bytes chunks, while it
+    is downloading, decompressed if it is gzipped(.xml.gz files
+    or gzip content-encoding).
+
+    raises EOFError if gzipped file is not complete.
+    '''
+    import zlib
+
+    with session.get(url, stream=True, timeout=60) as response:
+        response.raise_for_status()
+
+        # content-encoding is undone by requests itself
+        decompressor = None
+
+        for chunk in response.iter_content(chunk_size):
+            # gzipped file itself
+            if decompressor is None:
+                decompressor = (zlib.decompressobj(16 + zlib.MAX_WBITS)
+                                if chunk[:2] == b"\x1f\x8b" else False)
+
+            yield decompressor.decompress(chunk) if decompressor else chunk
+
+        if decompressor:
+            # data that decompressor still keeps
+            yield decompressor.flush()
+
+            if not decompressor.eof:
+                raise EOFError(f"Gzipped sitemap {url} is not complete")
+
+
+def iter_sitemap_urls(sitemap_url, with_lastmod=False,
+                      session=None, _seen=None):
+    '''
+    yield urls from sitemap, while it is still downloading,
+    without keeping whole sitemap in memory.
+    gzipped sitemaps(.xml.gz) are supported and sitemap indexes
+    are followed recursively, so we get urls of all their sitemaps.
+
+    as it is generator, it can be directly used as urls
+    argument for MultiBr's get_with_multi method.
+
+    arguments:
+        1. sitemap_url - url of sitemap or sitemap index
+        2. with_lastmod - if set to True, (url, lastmod) tuples are
+                        yielded instead of urls, lastmod is None
+                        if sitemap does not have it(default=False)
+        3. session - requests session to use(default=None - new one,
+                        which is closed at the end)
+
+    sitemap that is not complete(or not valid xml) raises
+    xml.etree.ElementTree.ParseError, after urls that were read.
+    '''
+    from xml.etree.ElementTree import XMLPullParser
+
+    # to not follow same sitemap twice(loops in indexes)
+    _seen = set() if _seen is None else _seen
+    if sitemap_url in _seen:
+        return
+    _seen.add(sitemap_url)
+
+    own_session = session is None
+    if own_session:
+        session = _new_http_session()
+
+    parser = XMLPullParser(events=("start", "end"))
+    root = None
+
+    try:
+        # None at the end, to close parser
+        for chunk in itertools.chain(
+                        _iter_sitemap_chunks(sitemap_url, session), [None]):
+            if chunk is None:
+                # checks that document is complete
+                parser.close()
+            else:
+                parser.feed(chunk)
+
+            for event, element in parser.read_events():
+                if root is None:
+                    root = element
+
+                if event != "end":
+                    continue
+
+                # remove namespace
+                tag = element.tag.rsplit("}", 1)[-1]
+
+                if tag not in ["url", "sitemap"]:
+                    continue
+
+                values = {child.tag.rsplit("}", 1)[-1]:
+                                                (child.text or "").strip()
+                          for child in element}
+                loc, lastmod = values.get("loc"), values.get("lastmod")
+
+                # finished elements are not needed anymore
+                root.clear()
+
+                if not loc:
+                    continue
+
+                if tag == "sitemap":
+                    yield from iter_sitemap_urls(
+                                    loc, with_lastmod, session, _seen)
+                else:
+                    yield (loc, lastmod) if with_lastmod else loc
+    finally:
+        if own_session:
+            session.close()
+
+
+def iter_file_lines(path, as_json=False):
+    '''
+    yield not empty lines of given file one by one, file is
+    memory-mapped, so even huge files do not use memory
+    and os caches only parts that are read.
+
+    as it is generator, it can be directly used as urls(or with
+    as_json=True, as meta) argument for MultiBr's get_with_multi method.
+    file path itself can also be passed there.
+
+    arguments:
+        1. path - path of file with one item per line
+        2. as_json - if set to True, each line is parsed as json,
+                    useful for json lines files with meta
+                    dictionaries(default=False)
+    '''
+    import mmap
+
+    with open(path, "rb") as f:
+        # mmap can not map empty files
+        if not os.fstat(f.fileno()).st_size:
+            return
+
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            for line in iter(mapped.readline, b""):
+                line = line.strip()
+
+                if line:
+                    line = line.decode("utf-8")
+                    yield json.loads(line) if as_json else line
@@ -23,7 +23,7 @@ def get_key_to_press(current_val):
     helper = dict(zip(ascii_letters, ascii_letters))
 
     specials = {
-        '␣': 'space',  # key to use in br.press method
+        '␣': '<space>',  # key name to use in br.press_many method
     }
 
     helper.update(specials)
@@ -35,30 +35,39 @@ def get_key_to_press(current_val):
         )
 
 
+# characters from cursor to the end of current word(with space after it)
+get_current_word = '''
+    var chars = [];
+    var item = document.querySelector(
+                "div.TextInput-fragment span.TextInput-item--cursor");
+
+    while (item) {
+        chars.push(item.textContent);
+        if (item.textContent.trim() === "␣") { break; }
+        item = item.nextElementSibling;
+    }
+    return chars;
+'''
+
 document_body = br.css1('body')
 
 counter = 0
 main_start_time = time.time()
 
-while True:
-    print(time.time())
-    active_char = br.css1('div.TextInput-fragment span.TextInput-item--cursor').text
-    print(time.time())
-    translated_char, special_case = get_key_to_press(active_char)
-    print(time.time())
+while counter < 100:
+    active_chars = br.js(get_current_word)
 
-    if not special_case:
-        document_body.send_keys(translated_char)
-    else:
-        br.press(translated_char, elem=document_body)
-    print(time.time())
+    if not active_chars:
+        break
 
-    print(f"Clicked on {active_char} ({translated_char})")
-    # time.sleep(0.001)
+    keys = [get_key_to_press(char)[0] for char in active_chars]
 
+    # whole word with one request, "<space>" is pressed as space key
+    br.press_many(keys, elem=document_body)
+
+    print(f"Typed {''.join(active_chars)} ({keys})")
     print("-" * 100)
 
-    counter += 1
-    if counter == 100:
-        print(f"Done In {time.time() - main_start_time}")
-        break
+    counter += len(keys)
+
+print(f"Done In {time.time() - main_start_time}")
@@ -19,7 +19,7 @@ document_body = br.css1('body')
 while True:
     active_word = br.css1('span.currentword').text
     
-    document_body.send_keys(active_word + " ")
+    br.type_stream(active_word + " ", elem=document_body)
 
     print(f"Typed word: {active_word}")
     # time.sleep(0.1)